@@ -0,0 +1,179 @@
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import timeit
+import tracemalloc
+
+#Modules importing code.py alone must not load: plotting, reporting and pandas load on first use
+HEAVY_MODULES = ['pandas', 'matplotlib', 'subprocess']
+#Child process of startup(): import code.py, then print the import time, peak RSS and which HEAVY_MODULES are loaded
+STARTUP_SCRIPT = '''
+import resource, sys, time
+start = time.perf_counter()
+import code
+seconds = time.perf_counter() - start
+print(seconds, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, ','.join(name for name in {modules!r} if name in sys.modules))
+'''
+
+#A typical forCode.csv row
+SCENARIO = {'bid_rate': 2.75, 'project_size': 3.0, 'loan_size': 70, 'pay_emi_in': 11, 'subsidy_size': 1.8e7, 'DCR_status': True}
+
+def load_model(path='code.py', name='pmyojana_bench'):
+    '''
+    Imports a code.py by path, so an older copy (e.g. from git show) can be benchmarked the same way.
+    '''
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def _report_case(module, model):
+    '''
+    generate_latex_report in a temporary directory with pdflatex stubbed out.
+    '''
+    import matplotlib.pyplot as plt
+
+    def case():
+        cwd = os.getcwd()
+        run = subprocess.run
+        with tempfile.TemporaryDirectory() as directory:
+            os.chdir(directory)
+            subprocess.run = lambda *args, **kwargs: None
+            try:
+                model.generate_latex_report(**SCENARIO)
+            finally:
+                subprocess.run = run
+                os.chdir(cwd)
+                plt.close('all')
+    return case
+
+def cases(module, scenarios_path='forCode.csv'):
+    '''
+    Name -> (callable, rows per call, calls per timing) of every benchmarked hot path.
+    '''
+    model = module.PMYojana()
+    benchmarks = {
+        'nominal_amount': (lambda: model.nominal_amount(**SCENARIO), 1, 200),
+        'real_amount': (lambda: model.real_amount(**SCENARIO), 1, 200),
+        '_annualized_return': (lambda: model._annualized_return(realized=True, **SCENARIO), 1, 200),
+        'full_roi': (lambda: model.full_roi(_output=True, **SCENARIO), 1, 200),
+        'generate_latex_report': (_report_case(module, model), 1, 3),
+    }
+    if hasattr(model, 'cash_flows'):
+        benchmarks['cash_flows'] = (lambda: model.cash_flows(**SCENARIO), 1, 200)
+    if hasattr(model, 'batch_evaluate'):
+        scenarios = module.load_scenarios(scenarios_path)
+        benchmarks['batch_evaluate'] = (lambda: model.batch_evaluate(scenarios), len(scenarios), 5)
+
+    return benchmarks
+
+def run(module, repeat=3):
+    '''
+    Best-of-repeat seconds per call, rows/s and peak traced memory of each case.
+    Output printed by the methods is discarded so it does not distort the timings.
+    '''
+    results = {}
+    for name, (case, rows, number) in cases(module).items():
+        with contextlib.redirect_stdout(io.StringIO()):
+            case()
+            seconds = min(timeit.repeat(case, number=number, repeat=repeat)) / number
+            tracemalloc.start()
+            case()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        results[name] = {'seconds': seconds, 'rows_per_s': rows/seconds, 'peak_kb': peak/1024}
+
+    return results
+
+def startup(path='code.py', repeat=3):
+    '''
+    Cold import of path in a fresh interpreter, run with python -X importtime.
+    Returns best-of-repeat import seconds, peak RSS, the HEAVY_MODULES it loaded and the slowest imports it triggered
+    (cumulative microseconds from -X importtime), in the same shape as the run() cases.
+    '''
+    with tempfile.TemporaryDirectory() as directory:
+        #as code.py in an empty directory, so an older copy is imported the same way
+        shutil.copy(path, os.path.join(directory, 'code.py'))
+        timings = []
+        for _ in range(repeat):
+            completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', STARTUP_SCRIPT.format(modules=HEAVY_MODULES)], cwd=directory, capture_output=True, text=True, check=True)
+            seconds, peak, heavy = (completed.stdout.split() + [''])[:3]
+            timings.append((float(seconds), int(peak), heavy, completed.stderr))
+    seconds, peak, heavy, importtime = min(timings)
+
+    #-X importtime lists an import's children before it; the direct children of code are indented by one level
+    imports = []
+    for line in importtime.splitlines():
+        fields = line.split('|')
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        name = fields[2][1:]
+        if name == 'code':
+            break
+        if name.startswith('  ') and not name.startswith('   '):
+            imports.append((name.strip(), int(fields[1])))
+        elif not name.startswith(' '):
+            imports = []
+    slowest = dict(sorted(imports, key=lambda item: -item[1])[:5])
+
+    return {'seconds': seconds, 'rows_per_s': 1/seconds, 'peak_kb': float(peak), 'heavy_modules': heavy.split(',') if heavy else [], 'slowest_imports_us': slowest}
+
+def regressions(results, baseline, threshold=0.25):
+    '''
+    Cases whose time or peak memory grew by more than threshold relative to baseline.
+    '''
+    flagged = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        for key in ['seconds', 'peak_kb']:
+            if result[key] > baseline[name][key] * (1 + threshold):
+                flagged.append(f'{name}: {key} {baseline[name][key]:.6g} -> {result[key]:.6g}')
+        for module in set(result.get('heavy_modules', [])) - set(baseline[name].get('heavy_modules', [])):
+            flagged.append(f'{name}: now imports {module}')
+    return flagged
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the PMYojana hot paths: time and peak memory per case.')
+    parser.add_argument('--code', default='code.py', help='code.py to benchmark (e.g. an older copy from git show)')
+    parser.add_argument('--save', help='write the results as JSON')
+    parser.add_argument('--compare', help='baseline JSON from --save; exit with 1 on regressions')
+    parser.add_argument('--threshold', type=float, default=0.25, help='allowed relative slowdown or memory growth')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    import matplotlib
+    matplotlib.use('Agg')
+    results = {'import code.py': startup(args.code, repeat=args.repeat)}
+    results.update(run(load_model(args.code), repeat=args.repeat))
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+
+    print(f"{'case':<24}{'time (us)':>14}{'rows/s':>14}{'peak (KiB)':>12}{'vs baseline':>13}")
+    for name, result in results.items():
+        change = f"{baseline[name]['seconds']/result['seconds']:>12.2f}x" if name in baseline else f"{'-':>13}"
+        print(f"{name:<24}{result['seconds']*1e6:>14.1f}{result['rows_per_s']:>14.0f}{result['peak_kb']:>12.1f}{change}")
+    startup_result = results['import code.py']
+    print(f"import code.py loads {', '.join(startup_result['heavy_modules']) or 'none'} of {', '.join(HEAVY_MODULES)}; slowest imports (us): {startup_result['slowest_imports_us']}")
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'code': args.code, 'python': sys.version.split()[0], 'machine': platform.machine(), 'results': results}, f, indent=2)
+    flagged = regressions(results, baseline, args.threshold)
+    for line in flagged:
+        print(f'REGRESSION {line}')
+    if flagged:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -1,17 +1,261 @@
-import pandas as pd
+import collections
+import os
+import sys
+import time
+
 import numpy as np
-import matplotlib.pyplot as plt
-import subprocess
 
-class PMYojana():
+#Column order of forCode.csv style scenario files
+SCENARIO_COLUMNS = ['bid_rate', 'project_size', 'loan_size', 'pay_emi_in', 'subsidy_size', 'DCR_status']
+#Optional per-scenario columns, with the same defaults as the PMYojana methods
+SCENARIO_DEFAULTS = {'cost_per_bigha_per_month': 3e4, 'monthly_expenses': 5e4, 'raise_rate': 1/2, 'bank_loan_rate': 0.105}
+
+def _pyplot():
+    '''
+    matplotlib.pyplot, imported on first use so the numeric core only needs NumPy.
+    Without a display (and no MPLBACKEND) the Agg backend is used instead of probing for a GUI one.
+    '''
+    if 'matplotlib.pyplot' not in sys.modules and 'MPLBACKEND' not in os.environ:
+        if sys.platform.startswith('linux') and not os.environ.get('DISPLAY') and not os.environ.get('WAYLAND_DISPLAY'):
+            import matplotlib
+            matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    return plt
+
+def load_scenarios(path='forCode.csv'):
+    '''
+    Reads a headerless forCode.csv style file into a DataFrame named by SCENARIO_COLUMNS.
+    Any trailing columns are kept as target, target_1, ...
+    '''
+    import pandas as pd
+
+    scenarios = pd.read_csv(path, header=None)
+    extra = ['target'] + [f'target_{i}' for i in range(1, scenarios.shape[1] - len(SCENARIO_COLUMNS))]
+    scenarios.columns = SCENARIO_COLUMNS + extra[:scenarios.shape[1] - len(SCENARIO_COLUMNS)]
+    scenarios['pay_emi_in'] = scenarios['pay_emi_in'].astype(int)
+    scenarios['DCR_status'] = scenarios['DCR_status'].astype(bool)
+
+    return scenarios
+
+class CashFlows():
+    '''
+    Cash-flow stages of one scenario (arrays of one value per period) or of a batch (N x periods arrays), without pandas.
+    Periods are years unless periods_per_year > 1; year then labels the year of each period.
+    '''
+    __slots__ = ('year', 'gross_return', 'emi', 'land_cost', 'expense_cost', 'nominal_amount', 'real_amount', 'overall_investment', 'periods_per_year')
+
+    #Stages with one value per period, which annual() adds up per year
+    PERIODIC = ('gross_return', 'emi', 'land_cost', 'expense_cost', 'nominal_amount', 'real_amount')
+
+    def __init__(self, year, gross_return, emi, land_cost, expense_cost, nominal_amount, real_amount, overall_investment, periods_per_year=1) -> None:
+        self.year = year
+        self.gross_return = gross_return
+        self.emi = emi
+        self.land_cost = land_cost
+        self.expense_cost = expense_cost
+        self.nominal_amount = nominal_amount
+        self.real_amount = real_amount
+        self.overall_investment = overall_investment
+        self.periods_per_year = periods_per_year
+
+    def overall(self, realized=True):
+        '''
+        Sum of the real (or nominal) amounts, added period by period in the same order as sum().
+        '''
+        amount = self.real_amount if realized else self.nominal_amount
+        return np.cumsum(amount, axis=-1)[..., -1]
+
+    def annual(self):
+        '''
+        These cash flows added up per year; annual cash flows are returned as they are.
+        '''
+        if self.periods_per_year == 1:
+            return self
+        yearly = [_resample(getattr(self, name), self.periods_per_year, 1) for name in self.PERIODIC]
+        return CashFlows(self.year[::self.periods_per_year], *yearly, self.overall_investment)
+
+    def to_frame(self):
+        '''
+        Single scenario cash flows as a DataFrame with the column names of the PMYojana methods.
+        '''
+        import pandas as pd
+
+        dictionary = {'Year': self.year, 'Gross Return': self.gross_return, 'EMI': self.emi, 'Land Cost': self.land_cost, 'Expense Cost': self.expense_cost, 'Nominal Amount': self.nominal_amount, 'Real Amount': self.real_amount}
+        if self.periods_per_year > 1:
+            dictionary = {'Year': self.year, 'Period': np.arange(1, len(self.year) + 1), **dictionary}
+        return pd.DataFrame.from_dict(dictionary)
+
+def _per_year(value):
+    '''
+    Adds a trailing year (or period) axis so scalars and (N,) arrays broadcast against the yearly curves.
+    '''
+    return np.asarray(value, dtype=float)[..., None]
+
+def _check_emi_years(pay_emi_in):
+    '''
+    A loan has to be repaid over at least one year; shorter terms would leave it unpaid.
+    '''
+    pay_emi_in = np.asarray(pay_emi_in)
+    if np.any(pay_emi_in < 1):
+        raise ValueError(f'pay_emi_in must be at least 1 year, got {pay_emi_in[pay_emi_in < 1].ravel()[:10].tolist()}.')
+
+def _resample(values, periods_per_year, to_periods_per_year):
+    '''
+    Converts per-period amounts along the last axis to another number of periods per year:
+    finer periods split each amount evenly, coarser ones add them up.
+    '''
+    if to_periods_per_year == periods_per_year:
+        return values
+    if to_periods_per_year % periods_per_year == 0:
+        split = to_periods_per_year // periods_per_year
+        return np.repeat(values/split, split, axis=-1)
+    if periods_per_year % to_periods_per_year == 0:
+        values = np.asarray(values)
+        return values.reshape(values.shape[:-1] + (-1, periods_per_year // to_periods_per_year)).sum(axis=-1)
+    raise ValueError(f'Cannot convert {periods_per_year} to {to_periods_per_year} periods per year.')
+
+class StageTimings():
+    '''
+    Call counts and seconds per pipeline stage, collected by PMYojana.instrument().
+    '''
     def __init__(self) -> None:
+        self.calls = {}
+        self.seconds = {}
+
+    def record(self, stage: str, seconds: float):
+        self.calls[stage] = self.calls.get(stage, 0) + 1
+        self.seconds[stage] = self.seconds.get(stage, 0.0) + seconds
+
+    def summary(self):
+        return {stage: {'calls': self.calls[stage], 'seconds': self.seconds[stage], 'mean': self.seconds[stage]/self.calls[stage]} for stage in self.calls}
+
+class SensitivityGrid():
+    '''
+    Result of PMYojana.sensitivity: an N-D array of one metric with one labelled axis per swept parameter.
+    '''
+    __slots__ = ('values', 'axes', 'metric')
+
+    def __init__(self, values, axes, metric) -> None:
+        self.values = values
+        self.axes = axes
+        self.metric = metric
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    def to_series(self):
+        '''
+        The grid as a pandas Series on a MultiIndex of the swept parameters.
+        '''
+        import pandas as pd
+
+        index = pd.MultiIndex.from_product(list(self.axes.values()), names=list(self.axes))
+        return pd.Series(self.values.ravel(), index=index, name=self.metric)
+
+class PMYojana():
+    #Changing any of these on an instance invalidates its curve cache
+    MODEL_CONSTANTS = ('DCR', 'NON_DCR', 'INFLATION', 'YOJANA_LENGTH', 'UNITS', 'LAND_INCREASE')
+    #Most curves kept per instance (one per distinct raise_rate for expense); the least recently used is dropped beyond this
+    CURVE_CACHE_SIZE = 128
+    #Arrays with more distinct raise_rates than this get closed-form expense curves instead of cached ones
+    CACHED_RAISE_RATES = 32
+
+    def __init__(self, yojana_length=25) -> None:
+        self._curve_cache = collections.OrderedDict()
+        self._curve_stats = {'hits': 0, 'misses': 0, 'invalidations': 0}
         self.DCR = 33e6 #DCR Program cost per MW
         self.NON_DCR = 26e6 #Non-DCR Program cost per MW
         self.INFLATION = 0.06 #Inflation Rate
-        self.YOJANA_LENGTH = 25 #How long is the Yojana
+        self.YOJANA_LENGTH = yojana_length #How long is the Yojana, in years
         self.UNITS = 4500 #Units per MW
         self.LAND_INCREASE = 0.05 #how much it increases every two years
 
+    def __setattr__(self, name, value):
+        if name in self.MODEL_CONSTANTS and name in self.__dict__ and self.__dict__[name] != value:
+            self.curve_cache_clear()
+            self._curve_stats['invalidations'] += 1
+        super().__setattr__(name, value)
+
+    def curve(self, name: str, raise_rate=1/2):
+        '''
+        Cached yearly factor curve over YOJANA_LENGTH years, computed once per set of model constants.
+        name is one of degradation, land, inflation or expense (which depends on raise_rate).
+        The returned arrays are read-only and shared between calls.
+        '''
+        key = (name, float(raise_rate)) if name == 'expense' else (name,)
+        cached = self._curve_cache.get(key)
+        if cached is not None:
+            self._curve_cache.move_to_end(key)
+            self._curve_stats['hits'] += 1
+            return cached
+        self._curve_stats['misses'] += 1
+
+        years = range(self.YOJANA_LENGTH)
+        if name == 'degradation':
+            values = [1.0] * self.YOJANA_LENGTH
+            values[0] = 0.98
+            for i in range(1, len(values)):
+                values[i] *= values[i-1]*0.994
+        elif name == 'land':
+            values = [(1 + self.LAND_INCREASE)**(i//2) for i in years]
+        elif name == 'inflation':
+            values = [(1 + self.INFLATION)**(i+1) for i in years]
+        elif name == 'expense':
+            values = self._expense_rows(np.array([float(raise_rate)]))[0]
+        else:
+            raise ValueError(f'Unknown curve {name!r}.')
+        values = np.array(values)
+        values.setflags(write=False)
+        self._curve_cache[key] = values
+        if len(self._curve_cache) > self.CURVE_CACHE_SIZE:
+            self._curve_cache.popitem(last=False)
+
+        return values
+
+    def curve_cache_info(self):
+        '''
+        Hit/miss/invalidation counters and current size of the curve cache.
+        '''
+        return dict(self._curve_stats, size=len(self._curve_cache))
+
+    def curve_cache_clear(self):
+        self._curve_cache.clear()
+
+    #Stage name of each instrumented method; the loan and EMI are timed where cash_flows, emi_array and Scenario all compute them
+    STAGES = {'gross_return_array': 'gross', '_loan_amount_array': 'loan', '_emi_from_loan': 'emi', 'land_cost_array': 'land', 'expense_array': 'expenses', 'cash_flows': 'cash flows', 'payback_years': 'payback', '_evaluate_inputs': 'batch'}
+
+    def instrument(self, timings=None):
+        '''
+        Opt-in per-stage timing: wraps the pipeline stages of this instance so every call is recorded in timings
+        (a StageTimings, created if not given). Curve calls are split into curve build (cache miss) and curve lookup.
+        Uninstrumented instances pay nothing; call uninstrument() before pickling the instance.
+        '''
+        timings = StageTimings() if timings is None else timings
+        for name, stage in self.STAGES.items():
+            method = getattr(type(self), name)
+            def timed(*args, _method=method, _stage=stage, **kwargs):
+                start = time.perf_counter()
+                result = _method(self, *args, **kwargs)
+                timings.record(_stage, time.perf_counter() - start)
+                return result
+            self.__dict__[name] = timed
+        def timed_curve(*args, **kwargs):
+            misses = self._curve_stats['misses']
+            start = time.perf_counter()
+            result = PMYojana.curve(self, *args, **kwargs)
+            timings.record('curve build' if self._curve_stats['misses'] > misses else 'curve lookup', time.perf_counter() - start)
+            return result
+        self.__dict__['curve'] = timed_curve
+        self.timings = timings
+
+        return timings
+
+    def uninstrument(self):
+        for name in list(self.STAGES) + ['curve', 'timings']:
+            self.__dict__.pop(name, None)
+
     def loan_amount(self, project_size: float, DCR_status: bool, loan_size: float, subsidy_size:float):
         '''
         If the loan_size is a percent, this function simply converts it to an amount.
@@ -30,16 +274,10 @@ class PMYojana():
         '''
         The absolute return without any cost involved. Calculates the gross number.
         '''
-        nominal_per_year = project_size * 4500 * 365 * bid_rate #Return in Rupees/per year
-        total_return = [nominal_per_year] * self.YOJANA_LENGTH
-        solar_breakdown = [1.0]*25
-        solar_breakdown[0] = 0.98
-        for i in range(1, len(solar_breakdown)):
-            solar_breakdown[i] *= solar_breakdown[i-1]*0.994
-        for j in range(len(total_return)):
-            total_return[j] *= solar_breakdown[j]
-        dictionary = {'Year': np.arange(1, 26), 'Gross Return': total_return}
-        absolute_structure = pd.DataFrame.from_dict(dictionary)       
+        import pandas as pd
+
+        dictionary = {'Year': np.arange(1, self.YOJANA_LENGTH + 1), 'Gross Return': self.gross_return_array(bid_rate=bid_rate, project_size=project_size)}
+        absolute_structure = pd.DataFrame.from_dict(dictionary)
 
         return absolute_structure
 
@@ -48,18 +286,12 @@ class PMYojana():
         '''
         EMI Payment structure for the specified length.
         '''
-        structure = [0.0] * self.YOJANA_LENGTH
-
-        #loan in percent
-        loan_size = self.loan_amount(project_size=project_size, DCR_status=DCR_status, loan_size=loan_size, subsidy_size=subsidy_size)
+        import pandas as pd
 
-        emi_amount = (loan_size * bank_loan_rate)/(1 - (1 + bank_loan_rate)**(-1*pay_emi_in))
+        structure = self.emi_array(project_size=project_size, loan_size=loan_size, pay_emi_in=pay_emi_in, subsidy_size=subsidy_size, bank_loan_rate=bank_loan_rate, DCR_status=DCR_status)
 
-        for i in range(pay_emi_in):
-            structure[i] = emi_amount
-        
         #Creating a dictionary for exit
-        dictionary = {'Year': np.arange(1, 26), 'EMI': structure}
+        dictionary = {'Year': np.arange(1, self.YOJANA_LENGTH + 1), 'EMI': structure}
         emi_structure = pd.DataFrame.from_dict(dictionary)
 
         return emi_structure
@@ -68,24 +300,23 @@ class PMYojana():
         '''
         Nominal amount = Total amount - EMI Payment
         '''
-        total_amount = self.total_amount(bid_rate=bid_rate, project_size=project_size)
-        emi_pay = self.emi_payment(project_size=project_size, loan_size=loan_size, pay_emi_in=pay_emi_in, subsidy_size=subsidy_size, DCR_status=DCR_status)
-        land_cost = self.land_cost(project_size=project_size, cost_per_bigha_per_month=cost_per_bigha_per_month)
-        expense_cost = self.expenses(monthly_expenses=monthly_expenses, raise_rate=raise_rate)
-        nominal_amount = total_amount
-        nominal_amount['Nominal Amount'] = total_amount['Gross Return'] - emi_pay['EMI'] - land_cost['Land Cost'] - expense_cost['Expense Cost']
+        import pandas as pd
 
-        return nominal_amount[['Year', 'Nominal Amount']]
+        flows = self.cash_flows(bid_rate=bid_rate, project_size=project_size, loan_size=loan_size, pay_emi_in=pay_emi_in, subsidy_size=subsidy_size, DCR_status=DCR_status, cost_per_bigha_per_month=cost_per_bigha_per_month, monthly_expenses=monthly_expenses, raise_rate=raise_rate)
+        dictionary = {'Year': flows.year, 'Nominal Amount': flows.nominal_amount}
+        nominal_amount = pd.DataFrame.from_dict(dictionary)
+
+        return nominal_amount
     
     def inflation_rate(self, ):
         '''
-        Calculates the effects of inflation for 25Y.
+        Calculates the effects of inflation over the Yojana.
         '''
-        inflation_adjust = [1.0] * self.YOJANA_LENGTH
-        for i in range(len(inflation_adjust)):
-            inflation_adjust[i] *= (1 + self.INFLATION)**(i+1)
+        import pandas as pd
+
+        inflation_adjust = self.curve('inflation').copy()
 
-        dictionary = {'Year': np.arange(1, 26), 'Inflation': inflation_adjust}
+        dictionary = {'Year': np.arange(1, self.YOJANA_LENGTH + 1), 'Inflation': inflation_adjust}
         inflation_by_year = pd.DataFrame.from_dict(dictionary)
 
         return inflation_by_year
@@ -94,53 +325,36 @@ class PMYojana():
         '''
         Nominal amount realized by the inflation factor.
         '''
-        #get Nominal Amounts
-        nominal_amount = self.nominal_amount(bid_rate=bid_rate, project_size=project_size, loan_size=loan_size, pay_emi_in=pay_emi_in, subsidy_size=subsidy_size, DCR_status=DCR_status, cost_per_bigha_per_month=cost_per_bigha_per_month, monthly_expenses=monthly_expenses, raise_rate=raise_rate)
-        
-        #turn it into Real Amounts
-        real_amount = nominal_amount
-
-        #inflation
-        inflation = self.inflation_rate()
+        import pandas as pd
 
-        real_amount['Real Amount'] = nominal_amount['Nominal Amount'] / inflation['Inflation']
+        flows = self.cash_flows(bid_rate=bid_rate, project_size=project_size, loan_size=loan_size, pay_emi_in=pay_emi_in, subsidy_size=subsidy_size, DCR_status=DCR_status, cost_per_bigha_per_month=cost_per_bigha_per_month, monthly_expenses=monthly_expenses, raise_rate=raise_rate)
+        dictionary = {'Year': flows.year, 'Real Amount': flows.real_amount}
+        real_amount = pd.DataFrame.from_dict(dictionary)
 
-        return real_amount[['Year', 'Real Amount']]
+        return real_amount
     
     def annualized_return(self, bid_rate: float, project_size: float, loan_size: float, pay_emi_in: int, subsidy_size: float, realized=True, DCR_status=True, cost_per_bigha_per_month = 3e4, monthly_expenses=5e4, raise_rate=1/2):
+        flows = self.cash_flows(bid_rate=bid_rate, project_size=project_size, loan_size=loan_size, pay_emi_in=pay_emi_in, subsidy_size=subsidy_size, DCR_status=DCR_status, cost_per_bigha_per_month=cost_per_bigha_per_month, monthly_expenses=monthly_expenses, raise_rate=raise_rate)
+        overall_val = float(flows.overall(realized=realized))
+        overall_investment = float(flows.overall_investment)
         if realized:
-            amount = self.real_amount(bid_rate=bid_rate, project_size=project_size, loan_size=loan_size, subsidy_size=subsidy_size, pay_emi_in=pay_emi_in, cost_per_bigha_per_month = cost_per_bigha_per_month, monthly_expenses=monthly_expenses, raise_rate=raise_rate)
-            overall_val = sum(amount['Real Amount'])
-        else:
-            amount = self.nominal_amount(bid_rate=bid_rate, project_size=project_size, loan_size=loan_size, subsidy_size=subsidy_size, pay_emi_in=pay_emi_in, cost_per_bigha_per_month = cost_per_bigha_per_month,monthly_expenses=monthly_expenses, raise_rate=raise_rate)
-            overall_val = sum(amount['Nominal Amount'])
-        if DCR_status:
-            overall_investment = (project_size * self.DCR) - self.loan_amount(project_size=project_size, subsidy_size=subsidy_size, DCR_status=DCR_status, loan_size=loan_size) - subsidy_size
-            if realized:
-                print(f'Realized return of {round(overall_val, 0)} INR on {round(overall_investment, 2)} investment.')
-                print(f'{round((((overall_val/overall_investment)**(1/25))-1)*100, 2)}% return over {self.INFLATION*100}% inflation over {self.YOJANA_LENGTH} years.')
-            else:
-                print(f'Nominal return of {round(overall_val, 0)} INR on {round(overall_investment, 2)} investment.')
-                print(f'{round((((overall_val/overall_investment)**(1/25))-1)*100, 2)}% return over {self.YOJANA_LENGTH} years.')
+            print(f'Realized return of {round(overall_val, 0)} INR on {round(overall_investment, 2)} investment.')
+            print(f'{round((((overall_val/overall_investment)**(1/self.YOJANA_LENGTH))-1)*100, 2)}% return over {self.INFLATION*100}% inflation over {self.YOJANA_LENGTH} years.')
         else:
-            overall_investment = (project_size * self.NON_DCR) - self.loan_amount(project_size=project_size, subsidy_size=subsidy_size, DCR_status=DCR_status, loan_size=loan_size) - subsidy_size
-            if realized:
-                print(f'Realized return of {round(overall_val, 0)} INR on {round(overall_investment, 2)} investment.')
-                print(f'{round((((overall_val/overall_investment)**(1/25))-1)*100, 2)}% return over {self.INFLATION*100}% inflation over {self.YOJANA_LENGTH} years.')
-            else:
-                print(f'Nominal return of {round(overall_val, 0)} INR on {round(overall_investment, 2)} investment.')
-                print(f'{round((((overall_val/overall_investment)**(1/25))-1)*100, 2)}% return over {self.YOJANA_LENGTH} years.')
-            
-        
+            print(f'Nominal return of {round(overall_val, 0)} INR on {round(overall_investment, 2)} investment.')
+            print(f'{round((((overall_val/overall_investment)**(1/self.YOJANA_LENGTH))-1)*100, 2)}% return over {self.YOJANA_LENGTH} years.')
+
         return 
 
     def figure_total(self, bid_rate: float, project_size: float, loan_size: float, pay_emi_in: int, subsidy_size: float, realized=True, DCR_status=True, cost_per_bigha_per_month = 3e4, monthly_expenses=5e4, raise_rate=1/2):
         '''
         Draw total, nominal, and emi payments.
         '''
-        emi_amount = self.emi_payment(project_size=project_size, loan_size=loan_size, subsidy_size=subsidy_size, pay_emi_in=pay_emi_in)
-        nominal_amount = self.nominal_amount(bid_rate=bid_rate, project_size=project_size, loan_size=loan_size, subsidy_size=subsidy_size, pay_emi_in=pay_emi_in, cost_per_bigha_per_month = cost_per_bigha_per_month, monthly_expenses=monthly_expenses, raise_rate=raise_rate)
-        real_amount = self.real_amount(bid_rate=bid_rate, project_size=project_size, loan_size=loan_size, subsidy_size=subsidy_size, pay_emi_in=pay_emi_in, cost_per_bigha_per_month = cost_per_bigha_per_month, monthly_expenses=monthly_expenses, raise_rate=raise_rate)
+        plt = _pyplot()
+
+        emi_amount = self.emi_payment(project_size=project_size, loan_size=loan_size, subsidy_size=subsidy_size, pay_emi_in=pay_emi_in, DCR_status=DCR_status)
+        nominal_amount = self.nominal_amount(bid_rate=bid_rate, project_size=project_size, loan_size=loan_size, subsidy_size=subsidy_size, pay_emi_in=pay_emi_in, DCR_status=DCR_status, cost_per_bigha_per_month = cost_per_bigha_per_month, monthly_expenses=monthly_expenses, raise_rate=raise_rate)
+        real_amount = self.real_amount(bid_rate=bid_rate, project_size=project_size, loan_size=loan_size, subsidy_size=subsidy_size, pay_emi_in=pay_emi_in, DCR_status=DCR_status, cost_per_bigha_per_month = cost_per_bigha_per_month, monthly_expenses=monthly_expenses, raise_rate=raise_rate)
 
         plt.plot(emi_amount['Year'], emi_amount['EMI']/1e5)
         plt.plot(emi_amount['Year'], nominal_amount['Nominal Amount']/1e5)
@@ -159,128 +373,56 @@ class PMYojana():
         return
     
     def _annualized_return(self, bid_rate: float, project_size: float, loan_size: float, pay_emi_in: int, subsidy_size: float, realized: bool, DCR_status: bool, cost_per_bigha_per_month = 3e4, monthly_expenses=5e4, raise_rate=1/2):
-        if realized:
-            amount = self.real_amount(bid_rate=bid_rate, project_size=project_size, loan_size=loan_size, subsidy_size=subsidy_size, pay_emi_in=pay_emi_in, cost_per_bigha_per_month = cost_per_bigha_per_month, monthly_expenses=monthly_expenses, raise_rate=raise_rate)
-            overall_val = sum(amount['Real Amount'])
-        else:
-            amount = self.nominal_amount(bid_rate=bid_rate, project_size=project_size, loan_size=loan_size, subsidy_size=subsidy_size, pay_emi_in=pay_emi_in, cost_per_bigha_per_month = cost_per_bigha_per_month, monthly_expenses=monthly_expenses, raise_rate=raise_rate)
-            overall_val = sum(amount['Nominal Amount'])
-        if DCR_status:
-            overall_investment = (project_size * self.DCR) - self.loan_amount(project_size=project_size, subsidy_size=subsidy_size, DCR_status=DCR_status, loan_size=loan_size) - subsidy_size
-        else:
-            overall_investment = (project_size * self.NON_DCR) - self.loan_amount(project_size=project_size, subsidy_size=subsidy_size, DCR_status=DCR_status, loan_size=loan_size) - subsidy_size
-        
-        return (((overall_val/overall_investment)**(1/25))-1)*100
+        flows = self.cash_flows(bid_rate=bid_rate, project_size=project_size, loan_size=loan_size, pay_emi_in=pay_emi_in, subsidy_size=subsidy_size, DCR_status=DCR_status, cost_per_bigha_per_month=cost_per_bigha_per_month, monthly_expenses=monthly_expenses, raise_rate=raise_rate)
+        overall_val = float(flows.overall(realized=realized))
+        overall_investment = float(flows.overall_investment)
+
+        return (((overall_val/overall_investment)**(1/self.YOJANA_LENGTH))-1)*100
 
     def _figure_return(self, bid_rate: float, project_size: float, loan_size: float, pay_emi_in: int, subsidy_size: float, compare: str, realized: bool, DCR_status: bool, cost_per_bigha_per_month = 3e4, monthly_expenses=5e4, raise_rate=1/2):
-        if compare == 'bid_rate':
-            if type(bid_rate) != list:
-                x = np.linspace(0.5*bid_rate, 1.5*bid_rate, 10)
-            else:
-                x = np.linspace(bid_rate[0], bid_rate[-1], 10)
-            #output
-            y = []
-            for val in x:
-                y.append(self._annualized_return(bid_rate=val, project_size=project_size, loan_size=loan_size, pay_emi_in=pay_emi_in, subsidy_size=subsidy_size, realized=realized, DCR_status=DCR_status, cost_per_bigha_per_month = cost_per_bigha_per_month, monthly_expenses=monthly_expenses, raise_rate=raise_rate))
-            plt.plot(x, y)
-            plt.scatter(x, y)
-            plt.grid(True)
-            plt.xlabel('Bid Rate')
-            if realized:
-                plt.ylabel(f'Realized Return over {round(self.INFLATION*100, 2)}% inflation')
-            else:
-                plt.ylabel('Nominal Return')
-        elif compare == 'project_size':
-            if type(project_size) != list:
-                x = np.linspace(0.5*project_size, 1.5*project_size, 10)
-            else:
-                x = np.linspace(project_size[0], project_size[-1], 10)
-            #output
-            y = []
-            for val in x:
-                y.append(self._annualized_return(bid_rate=bid_rate, project_size=val, loan_size=loan_size, pay_emi_in=pay_emi_in, subsidy_size=subsidy_size, realized=realized, DCR_status=DCR_status, cost_per_bigha_per_month = cost_per_bigha_per_month, monthly_expenses=monthly_expenses, raise_rate=raise_rate))
-            plt.plot(x, y)
-            plt.scatter(x, y)
-            plt.grid(True)
-            plt.xlabel('Project Size in MW')
-            if realized:
-                plt.ylabel(f'Realized Return over {round(self.INFLATION*100, 2)}% inflation')
-            else:
-                plt.ylabel('Nominal Return')
-        elif compare == 'loan_size':
-            if type(loan_size) != list:
-                x = np.linspace(0.75*loan_size, 1.25*loan_size, 10)
-            else:
-                x = np.linspace(loan_size[0], loan_size[-1], 10)
-            #output
-            y = []
-            for val in x:
-                y.append(self._annualized_return(bid_rate=bid_rate, project_size=project_size, loan_size=val, pay_emi_in=pay_emi_in, subsidy_size=subsidy_size, realized=realized, DCR_status=DCR_status, cost_per_bigha_per_month = cost_per_bigha_per_month, monthly_expenses=monthly_expenses, raise_rate=raise_rate))
-            plt.plot(x, y)
-            plt.scatter(x, y)
-            plt.grid(True)
-            plt.xlabel('Loan Amount')
-            if realized:
-                plt.ylabel(f'Realized Return over {round(self.INFLATION*100, 2)}% inflation')
-            else:
-                plt.ylabel('Nominal Return')
-        elif compare == 'pay_emi_in':
-            if type(pay_emi_in) != list:
-                x = np.arange(int(0.5*pay_emi_in), min(int(1.5*pay_emi_in) + 1, 16), 1)
-            else:
-                x = np.arange(pay_emi_in[0], pay_emi_in[-1], 1)
-            #output
-            y = []
-            for val in x:
-                y.append(self._annualized_return(bid_rate=bid_rate, project_size=project_size, loan_size=loan_size, pay_emi_in=val, subsidy_size=subsidy_size, realized=realized, DCR_status=DCR_status, cost_per_bigha_per_month = cost_per_bigha_per_month, monthly_expenses=monthly_expenses, raise_rate=raise_rate))
-            plt.plot(x, y)
-            plt.scatter(x, y)
-            plt.grid(True)
-            plt.xlabel('EMI Duration')
-            if realized:
-                plt.ylabel(f'Realized Return over {round(self.INFLATION*100, 2)}% inflation')
-            else:
-                plt.ylabel('Nominal Return')
-        elif compare == 'subsidy_size':
-            if type(subsidy_size) != list:
-                x = np.linspace(0.5*subsidy_size, 1.5*subsidy_size, 10)
+        plt = _pyplot()
+
+        xlabels = {'bid_rate': 'Bid Rate', 'project_size': 'Project Size in MW', 'loan_size': 'Loan Amount', 'pay_emi_in': 'EMI Duration', 'subsidy_size': 'Subsidy Size'}
+        if compare not in xlabels:
+            print('Error! Get better idiot (Check Spelling).')
+            return
+        params = {'bid_rate': bid_rate, 'project_size': project_size, 'loan_size': loan_size, 'pay_emi_in': pay_emi_in, 'subsidy_size': subsidy_size}
+        value = params.pop(compare)
+        if compare == 'pay_emi_in':
+            if type(value) != list:
+                x = np.arange(int(0.5*value), min(int(1.5*value) + 1, 16), 1)
             else:
-                x = np.linspace(subsidy_size[0], subsidy_size[-1], 10)
-            #output
-            y = []
-            for val in x:
-                y.append(self._annualized_return(bid_rate=bid_rate, project_size=project_size, loan_size=loan_size, pay_emi_in=pay_emi_in, subsidy_size=val, realized=realized, DCR_status=DCR_status, cost_per_bigha_per_month = cost_per_bigha_per_month, monthly_expenses=monthly_expenses, raise_rate=raise_rate))
-            plt.plot(x, y)
-            plt.scatter(x, y)
-            plt.grid(True)
-            plt.xlabel('Subsidy Size')
-            if realized:
-                plt.ylabel(f'Realized Return over {round(self.INFLATION*100, 2)}% inflation')
+                x = np.arange(value[0], value[-1], 1)
+        else:
+            spread = 0.25 if compare == 'loan_size' else 0.5
+            if type(value) != list:
+                x = np.linspace((1 - spread)*value, (1 + spread)*value, 10)
             else:
-                plt.ylabel('Nominal Return')
+                x = np.linspace(value[0], value[-1], 10)
+        #output
+        metric = 'Real Return' if realized else 'Nominal Return'
+        y = self.sensitivity({compare: x}, metric=metric, DCR_status=DCR_status, cost_per_bigha_per_month=cost_per_bigha_per_month, monthly_expenses=monthly_expenses, raise_rate=raise_rate, **params).values
+        plt.plot(x, y)
+        plt.scatter(x, y)
+        plt.grid(True)
+        plt.xlabel(xlabels[compare])
+        if realized:
+            plt.ylabel(f'Realized Return over {round(self.INFLATION*100, 2)}% inflation')
         else:
-            print('Error! Get better idiot (Check Spelling).')
+            plt.ylabel('Nominal Return')
         return
     
     def full_roi(self, bid_rate: float, project_size: float, loan_size: float, pay_emi_in: int, subsidy_size: float, realized=True, DCR_status=True, cost_per_bigha_per_month = 3e4, monthly_expenses=5e4, raise_rate=1/2, _output=False):
-        real_amount = list(self.real_amount(bid_rate=bid_rate, project_size=project_size, loan_size=loan_size, pay_emi_in=pay_emi_in, subsidy_size=subsidy_size, DCR_status=DCR_status, cost_per_bigha_per_month = cost_per_bigha_per_month, monthly_expenses=monthly_expenses, raise_rate=raise_rate)['Real Amount'])
-        if DCR_status:
-            overall_investment = (project_size * self.DCR) - self.loan_amount(project_size=project_size, subsidy_size=subsidy_size, DCR_status=DCR_status, loan_size=loan_size) - subsidy_size
-        else:
-            overall_investment = (project_size * self.NON_DCR) - self.loan_amount(project_size=project_size, subsidy_size=subsidy_size, DCR_status=DCR_status, loan_size=loan_size) - subsidy_size
-        print(f'Investment of {round(overall_investment, 0)} INR.')
-        total_real_return = 0
-        for i in range(len(real_amount)):
-            total_real_return += real_amount[i]
-            if total_real_return >= overall_investment:
-                diff = overall_investment - (total_real_return - real_amount[i])
-                ratio_to_add = diff/real_amount[i]
-                year = i-1
-                break
+        flows = self.cash_flows(bid_rate=bid_rate, project_size=project_size, loan_size=loan_size, pay_emi_in=pay_emi_in, subsidy_size=subsidy_size, DCR_status=DCR_status, cost_per_bigha_per_month=cost_per_bigha_per_month, monthly_expenses=monthly_expenses, raise_rate=raise_rate)
+        overall_investment = float(flows.overall_investment)
+        payback = float(self.payback_years(flows.real_amount, overall_investment))
         if _output:
-            return round(year+1+ratio_to_add, 1)
+            return round(payback, 1)
+        print(f'Investment of {round(overall_investment, 0)} INR.')
+        if np.isnan(payback):
+            print(f'Investment is not recovered within {self.YOJANA_LENGTH} years.')
         else:
-            print(f'{round(year+1+ratio_to_add, 1)} years to get a full ROI.')
+            print(f'{round(payback, 1)} years to get a full ROI.')
         
         return
 
@@ -310,55 +452,493 @@ class PMYojana():
         return 4.0*project_size #bighas of land
     
     def land_cost(self, project_size: float, cost_per_bigha_per_month = 3e4):
-        total_land_cost = [cost_per_bigha_per_month] * self.YOJANA_LENGTH
-        for i in range(0, len(total_land_cost), 2):
-            total_land_cost[i] *= (1 + self.LAND_INCREASE)**(i//2)
-            if i + 1 < len(total_land_cost):
-                total_land_cost[i+1] *= (1 + self.LAND_INCREASE)**(i//2)
+        import pandas as pd
 
-        dictionary = {'Year': np.arange(1, 26), 'Land Cost': total_land_cost}
+        dictionary = {'Year': np.arange(1, self.YOJANA_LENGTH + 1), 'Land Cost': self.land_cost_array(project_size=project_size, cost_per_bigha_per_month=cost_per_bigha_per_month)}
         land_cost_by_year = pd.DataFrame.from_dict(dictionary)
-        land_cost_by_year['Land Cost'] *= self.land_need(project_size=project_size)
 
         return land_cost_by_year
     def expenses(self, monthly_expenses=5e4, raise_rate=1/2):
-        total_expenses = [monthly_expenses] * self.YOJANA_LENGTH 
-        for i in range(len(total_expenses)):
-            total_expenses[i] *= (1 + (self.INFLATION)*raise_rate)**(i)
-        dictionary = {'Year': np.arange(1, 26), 'Expense Cost': total_expenses}
+        import pandas as pd
+
+        dictionary = {'Year': np.arange(1, self.YOJANA_LENGTH + 1), 'Expense Cost': self.expense_array(monthly_expenses=monthly_expenses, raise_rate=raise_rate)}
         total_expenses_by_year = pd.DataFrame.from_dict(dictionary)
-        total_expenses_by_year['Expense Cost'] *= 12
-        
+
         return total_expenses_by_year   
 
-    def generate_latex_report(self, bid_rate: float, project_size: float, loan_size: float, pay_emi_in: int, subsidy_size: float, realized=True, DCR_status=True, cost_per_bigha_per_month = 3e4, monthly_expenses=5e4, raise_rate=1/2):
-        # Generate image
-        plt.figure(figsize=(15, 6))
-        self.figure_total(bid_rate, project_size, loan_size, pay_emi_in, subsidy_size, realized, DCR_status)
-        plt.savefig("figure_total.png")
-        
-        # Get full ROI
-        full_roi_output = self.full_roi(bid_rate, project_size, loan_size, pay_emi_in, subsidy_size, realized, DCR_status, cost_per_bigha_per_month = cost_per_bigha_per_month, monthly_expenses=monthly_expenses, raise_rate=raise_rate, _output=True)
-        overall_investment = self._overall_investment(project_size=project_size, loan_size=loan_size, subsidy_size=subsidy_size, DCR_status=DCR_status)
-        # Add data to the table
-        nominal_return = self.nominal_amount(bid_rate, project_size, loan_size, pay_emi_in, subsidy_size, DCR_status,cost_per_bigha_per_month = cost_per_bigha_per_month, monthly_expenses=monthly_expenses, raise_rate=raise_rate)["Nominal Amount"]
-        realized_return = self.real_amount(bid_rate, project_size, loan_size, pay_emi_in, subsidy_size, DCR_status, cost_per_bigha_per_month = cost_per_bigha_per_month, monthly_expenses=monthly_expenses, raise_rate=raise_rate)["Real Amount"]
-        land_cost = self.land_cost(project_size=project_size, cost_per_bigha_per_month=cost_per_bigha_per_month)['Land Cost']
+    def _loan_amount_array(self, project_size, DCR_status, loan_size, subsidy_size):
+        '''
+        loan_amount for scalars or arrays of scenarios.
+        '''
+        cost_per_mw = np.where(DCR_status, self.DCR, self.NON_DCR)
+        return np.where(np.asarray(loan_size) <= 100000, ((cost_per_mw * project_size - subsidy_size)) * (np.asarray(loan_size)/100), loan_size)
+
+    def gross_return_array(self, bid_rate, project_size):
+        '''
+        total_amount without the DataFrame: gross return per year, shape (YOJANA_LENGTH,) or (N, YOJANA_LENGTH).
+        '''
+        nominal_per_year = project_size * 4500 * 365 * np.asarray(bid_rate) #Return in Rupees/per year
+        return _per_year(nominal_per_year) * self.curve('degradation')
+
+    def emi_array(self, project_size, loan_size, pay_emi_in, subsidy_size, bank_loan_rate = 0.105, DCR_status=True):
+        '''
+        emi_payment without the DataFrame: EMI per year, shape (YOJANA_LENGTH,) or (N, YOJANA_LENGTH).
+        '''
+        loan_size = self._loan_amount_array(project_size=project_size, DCR_status=DCR_status, loan_size=loan_size, subsidy_size=subsidy_size)
+        return self._emi_from_loan(loan_size, pay_emi_in=pay_emi_in, bank_loan_rate=bank_loan_rate)
+
+    def _emi_from_loan(self, loan_amount, pay_emi_in, bank_loan_rate = 0.105, periods_per_year=1):
+        '''
+        EMI per period of a loan repaid in pay_emi_in years with periods_per_year installments a year.
+        '''
+        _check_emi_years(pay_emi_in)
+        rate = bank_loan_rate/periods_per_year
+        installments = np.asarray(pay_emi_in)*periods_per_year
+        emi_amount = (loan_amount * rate)/(1 - (1 + rate)**(-1*installments))
+        return np.where(np.arange(self.YOJANA_LENGTH*periods_per_year) < _per_year(installments), _per_year(emi_amount), 0.0)
+
+    def amortization_array(self, project_size, loan_size, pay_emi_in, subsidy_size, bank_loan_rate = 0.105, DCR_status=True, periods_per_year=12):
+        '''
+        Loan amortization with periods_per_year installments a year at bank_loan_rate/periods_per_year per period.
+        Returns EMI, Interest, Principal and the Balance left after each period, shape (periods,) or (N, periods).
+        '''
+        loan_amount = _per_year(self._loan_amount_array(project_size=project_size, DCR_status=DCR_status, loan_size=loan_size, subsidy_size=subsidy_size))
+        rate = _per_year(bank_loan_rate)/periods_per_year
+        installments = _per_year(np.asarray(pay_emi_in)*periods_per_year)
+        period = np.arange(1, self.YOJANA_LENGTH*periods_per_year + 1)
+        paying = period <= installments
+
+        emi_amount = (loan_amount * rate)/(1 - (1 + rate)**(-1*installments))
+        growth = (1 + rate)**np.minimum(period, installments)
+        balance = np.where(period < installments, loan_amount*growth - emi_amount*(growth - 1)/rate, 0.0)
+        opening = np.concatenate([np.broadcast_to(loan_amount, balance.shape[:-1] + (1,)), balance[..., :-1]], axis=-1)
+        interest = np.where(paying, opening*rate, 0.0)
+        emi = np.where(paying, emi_amount, 0.0)
+
+        return {'EMI': emi, 'Interest': interest, 'Principal': emi - interest, 'Balance': balance}
+
+    def amortization_schedule(self, project_size: float, loan_size: float, pay_emi_in: int, subsidy_size: float, bank_loan_rate = 0.105, DCR_status=True, periods_per_year=12):
+        '''
+        Monthly (or periods_per_year) EMI schedule of a scenario's loan for lender reporting.
+        '''
+        import pandas as pd
+
+        schedule = self.amortization_array(project_size=project_size, loan_size=loan_size, pay_emi_in=pay_emi_in, subsidy_size=subsidy_size, bank_loan_rate=bank_loan_rate, DCR_status=DCR_status, periods_per_year=periods_per_year)
+        periods = self.YOJANA_LENGTH*periods_per_year
+        dictionary = {'Year': np.arange(periods)//periods_per_year + 1, 'Period': np.arange(1, periods + 1), **schedule}
+
+        return pd.DataFrame.from_dict(dictionary)
+
+    def _investment_from_loan(self, project_size, DCR_status, subsidy_size, loan_amount):
+        cost_per_mw = np.where(DCR_status, self.DCR, self.NON_DCR)
+        return (project_size * cost_per_mw) - loan_amount - subsidy_size
+
+    def land_cost_array(self, project_size, cost_per_bigha_per_month = 3e4):
+        '''
+        land_cost without the DataFrame: land cost per year, shape (YOJANA_LENGTH,) or (N, YOJANA_LENGTH).
+        '''
+        return (_per_year(cost_per_bigha_per_month) * self.curve('land')) * self.land_need(project_size=_per_year(project_size))
+
+    def expense_array(self, monthly_expenses=5e4, raise_rate=1/2):
+        '''
+        expenses without the DataFrame: yearly expense cost, shape (YOJANA_LENGTH,) or (N, YOJANA_LENGTH).
+        '''
+        return (_per_year(monthly_expenses) * self._expense_curve(raise_rate=raise_rate)) * 12
+
+    def cash_flows(self, bid_rate, project_size, loan_size, pay_emi_in, subsidy_size, DCR_status=True, cost_per_bigha_per_month = 3e4, monthly_expenses=5e4, raise_rate=1/2, bank_loan_rate=0.105, periods_per_year=1, emi_periods_per_year=1):
+        '''
+        Every cash-flow stage of a scenario as NumPy arrays in a CashFlows object.
+        Scalars give (periods,) arrays; equal length arrays of parameters give (N, periods) arrays,
+        with YOJANA_LENGTH * periods_per_year periods (12 for monthly cash flows).
+        Yearly amounts are split evenly over the periods of their year and real amounts use that year's inflation,
+        so CashFlows.annual() adds back up to the yearly figures. The EMI is amortized with emi_periods_per_year
+        installments a year: 1 is the yearly EMI of emi_payment, 12 a monthly EMI at bank_loan_rate/12.
+        The DataFrame methods (total_amount, nominal_amount, real_amount, ...) are built on this.
+        '''
+        gross_return = _resample(self.gross_return_array(bid_rate=bid_rate, project_size=project_size), 1, periods_per_year)
+        loan_amount = self._loan_amount_array(project_size=project_size, DCR_status=DCR_status, loan_size=loan_size, subsidy_size=subsidy_size)
+        emi = _resample(self._emi_from_loan(loan_amount, pay_emi_in=pay_emi_in, bank_loan_rate=bank_loan_rate, periods_per_year=emi_periods_per_year), emi_periods_per_year, periods_per_year)
+        land_cost = _resample(self.land_cost_array(project_size=project_size, cost_per_bigha_per_month=cost_per_bigha_per_month), 1, periods_per_year)
+        expense_cost = _resample(self.expense_array(monthly_expenses=monthly_expenses, raise_rate=raise_rate), 1, periods_per_year)
+        nominal_amount = gross_return - emi - land_cost - expense_cost
+        real_amount = nominal_amount / np.repeat(self.curve('inflation'), periods_per_year)
+
+        overall_investment = self._investment_from_loan(project_size=project_size, DCR_status=DCR_status, subsidy_size=subsidy_size, loan_amount=loan_amount)
+
+        year = np.arange(self.YOJANA_LENGTH*periods_per_year)//periods_per_year + 1
+
+        return CashFlows(year, gross_return, emi, land_cost, expense_cost, nominal_amount, real_amount, overall_investment, periods_per_year)
+
+    def _batch_inputs(self, scenarios=None, **kwargs):
+        '''
+        Normalizes a DataFrame/dict of scenarios and keyword arrays into equal length 1-D arrays.
+        Keyword arguments override columns of scenarios; missing optional columns use SCENARIO_DEFAULTS.
+        '''
+        columns = {}
+        if scenarios is not None:
+            for name in SCENARIO_COLUMNS + list(SCENARIO_DEFAULTS):
+                if name in scenarios:
+                    columns[name] = scenarios[name]
+        for name, value in kwargs.items():
+            if name not in SCENARIO_COLUMNS and name not in SCENARIO_DEFAULTS:
+                raise TypeError(f'Unknown scenario parameter {name!r}.')
+            columns[name] = value
+        missing = [name for name in SCENARIO_COLUMNS if name not in columns and name != 'DCR_status']
+        if missing:
+            raise ValueError(f'Missing scenario parameters: {missing}.')
+        columns.setdefault('DCR_status', True)
+        for name, default in SCENARIO_DEFAULTS.items():
+            columns.setdefault(name, default)
+
+        arrays = np.broadcast_arrays(*[np.atleast_1d(np.asarray(columns[name], dtype=float)) for name in SCENARIO_COLUMNS + list(SCENARIO_DEFAULTS)])
+        inputs = dict(zip(SCENARIO_COLUMNS + list(SCENARIO_DEFAULTS), arrays))
+        inputs['pay_emi_in'] = inputs['pay_emi_in'].astype(int)
+        inputs['DCR_status'] = inputs['DCR_status'].astype(bool)
+        _check_emi_years(inputs['pay_emi_in'])
+
+        return inputs
+
+    def _expense_curve(self, raise_rate=1/2):
+        '''
+        Cached expense curve for a scalar raise_rate, or one row per scenario for an array of them.
+        Arrays with more than CACHED_RAISE_RATES distinct rates (random draws, sensitivity axes) are computed directly
+        without touching the cache, with the same expression as the cached curves so the results do not depend on
+        which other scenarios are in the batch.
+        '''
+        raise_rate = np.asarray(raise_rate, dtype=float)
+        if raise_rate.ndim == 0:
+            return self.curve('expense', raise_rate=raise_rate)
+        unique_rates, index = np.unique(raise_rate, return_inverse=True)
+        if len(unique_rates) > self.CACHED_RAISE_RATES:
+            return self._expense_rows(raise_rate)
+        return np.stack([self.curve('expense', raise_rate=rate) for rate in unique_rates])[index.reshape(raise_rate.shape)]
+
+    def _expense_rows(self, raise_rate):
+        '''
+        Expense growth (1 + INFLATION*raise_rate)**year for an array of raise_rates, one row per rate.
+        '''
+        return (1 + self.INFLATION*raise_rate[..., None])**np.arange(self.YOJANA_LENGTH)
+
+    def batch_evaluate(self, scenarios=None, cache=None, periods_per_year=1, emi_periods_per_year=1, **kwargs):
+        '''
+        Evaluates many scenarios in one (N x YOJANA_LENGTH) NumPy pass.
+        scenarios is a DataFrame or dict with SCENARIO_COLUMNS (plus any of SCENARIO_DEFAULTS); keyword arrays override it.
+        Returns a dictionary of arrays matching the per-scenario methods:
+        yearly (N x YOJANA_LENGTH) Gross Return, EMI, Land Cost, Expense Cost, Nominal Amount, Real Amount and
+        per-scenario (N,) Overall Investment, Overall Nominal, Overall Real, Nominal Return, Real Return and Full ROI.
+        Full ROI is NaN when the investment is never recovered.
+        periods_per_year=12 gives monthly cash flows (see cash_flows); Full ROI is still in years.
+        cache is an optional result_cache.ResultCache of yearly results; only scenarios missing from it are computed.
+        '''
+        inputs = self._batch_inputs(scenarios, **kwargs)
+        if cache is not None:
+            if periods_per_year != 1 or emi_periods_per_year != 1:
+                raise ValueError('The result cache only holds yearly cash flows.')
+            return cache.evaluate(self, inputs)
+        return self._evaluate_inputs(inputs, periods_per_year=periods_per_year, emi_periods_per_year=emi_periods_per_year)
+
+    def _evaluate_inputs(self, inputs, periods_per_year=1, emi_periods_per_year=1):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            flows = self.cash_flows(**inputs, periods_per_year=periods_per_year, emi_periods_per_year=emi_periods_per_year)
+        real_amount = flows.real_amount
+        overall_investment = flows.overall_investment
+
+        overall_nominal = flows.overall(realized=False)
+        overall_real = flows.overall(realized=True)
+
+        nominal_return = self._annualized(overall_nominal, overall_investment)
+        real_return = self._annualized(overall_real, overall_investment)
+        full_roi = self.payback_years(real_amount, overall_investment)/periods_per_year
+
+        return {
+            'Year': flows.year,
+            'Gross Return': flows.gross_return,
+            'EMI': flows.emi,
+            'Land Cost': flows.land_cost,
+            'Expense Cost': flows.expense_cost,
+            'Nominal Amount': flows.nominal_amount,
+            'Real Amount': real_amount,
+            'Overall Investment': overall_investment,
+            'Overall Nominal': overall_nominal,
+            'Overall Real': overall_real,
+            'Nominal Return': nominal_return,
+            'Real Return': real_return,
+            'Full ROI': full_roi,
+        }
+
+    def _annualized(self, overall, overall_investment):
+        '''
+        Annualized return in percent over the Yojana for arrays of overall amounts and investments.
+        '''
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return (((overall/overall_investment)**(1/self.YOJANA_LENGTH))-1)*100
+
+    def sensitivity(self, axes: dict, metric='Real Return', chunk_size=2**15, **kwargs):
+        '''
+        Evaluates metric over the Cartesian grid of axes, e.g. {'bid_rate': [2.5, 3.0], 'DCR_status': [True, False]}.
+        Any of SCENARIO_COLUMNS and SCENARIO_DEFAULTS can be an axis; the rest are fixed through kwargs.
+        The grid is evaluated chunk_size points at a time, so only chunk_size x YOJANA_LENGTH cash-flow rows are held in memory.
+        metric is one of the per-scenario outputs of batch_evaluate (Real Return, Full ROI, ...).
+        '''
+        axes = {name: np.asarray(values) for name, values in axes.items()}
+        for name in axes:
+            if name not in SCENARIO_COLUMNS and name not in SCENARIO_DEFAULTS:
+                raise ValueError(f'Unknown sensitivity axis {name!r}.')
+            if name in kwargs:
+                raise TypeError(f'{name!r} is both an axis and a fixed value.')
+        shape = tuple(len(values) for values in axes.values())
+        values = np.empty(shape)
+        flat_values = values.reshape(-1)
+        for start in range(0, flat_values.size, chunk_size):
+            index = np.unravel_index(np.arange(start, min(start + chunk_size, flat_values.size)), shape)
+            points = {name: axis[i] for (name, axis), i in zip(axes.items(), index)}
+            flat_values[start:start + chunk_size] = self._evaluate_inputs(self._batch_inputs(None, **kwargs, **points))[metric]
+
+        return SensitivityGrid(values, axes, metric)
+
+    def payback_years(self, real_amount, overall_investment):
+        '''
+        Years (with the fraction of the last year) until the cumulative real amount covers the investment.
+        real_amount is (periods,) or (N, periods); for periods shorter than a year the result is in periods.
+        Returns NaN where the investment is never recovered or there is no investment (zero or negative) to recover.
+        '''
+        real_amount = np.asarray(real_amount, dtype=float)
+        overall_investment = np.asarray(overall_investment, dtype=float)
+        cumulative_real = np.cumsum(real_amount, axis=-1)
+        recovered = cumulative_real >= overall_investment[..., None]
+        year = np.argmax(recovered, axis=-1)[..., None]
+        this_year = np.take_along_axis(real_amount, year, axis=-1)[..., 0]
+        diff = overall_investment - (np.take_along_axis(cumulative_real, year, axis=-1)[..., 0] - this_year)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(recovered.any(axis=-1) & (overall_investment > 0), year[..., 0] + diff/this_year, np.nan)
+
+    def _meets_target(self, inputs, target, metric):
+        results = self._evaluate_inputs(inputs)
+        value = results[metric]
+        #without own investment there is no return or payback to speak of
+        invested = results['Overall Investment'] > 0
+        if metric == 'Full ROI':
+            return invested & (value <= target) #NaN (never recovered) never meets it
+        return invested & (value >= target)
+
+    def _bisect(self, inputs, param, target, metric, low, high, smallest, tol, max_iter):
+        '''
+        Vectorized bisection for the boundary value of param where metric reaches target, assuming one crossing in [low, high].
+        smallest=True (a bool or one per scenario) finds the least value meeting the target, otherwise the largest.
+        NaN where no value in the bracket does.
+        '''
+        n = len(inputs[param])
+        low = np.full(n, float(low))
+        high = np.full(n, float(high))
+        smallest = np.broadcast_to(smallest, n)
+        at_low = self._meets_target(dict(inputs, **{param: low}), target, metric)
+        at_high = self._meets_target(dict(inputs, **{param: high}), target, metric)
+        #good is always the side meeting the target, edge the answer when the whole bracket meets it
+        good, bad, edge = np.where(smallest, high, low), np.where(smallest, low, high), np.where(smallest, low, high)
+        feasible, trivial = np.where(smallest, at_high, at_low), np.where(smallest, at_low, at_high)
+        for _ in range(max_iter):
+            if np.all(np.abs(good - bad) <= tol):
+                break
+            middle = (good + bad)/2
+            meets = self._meets_target(dict(inputs, **{param: middle}), target, metric)
+            good = np.where(meets, middle, good)
+            bad = np.where(meets, bad, middle)
+        solution = np.where(trivial, edge, good)
+
+        return np.where(feasible, solution, np.nan)
+
+    def solve_bid_rate(self, target: float, metric='Real Return', scenarios=None, low=0.0, high=20.0, tol=1e-6, max_iter=100, **kwargs):
+        '''
+        Minimum bid_rate per scenario reaching target.
+        metric is Real Return or Nominal Return (in %, solved in closed form since returns are linear in bid_rate)
+        or Full ROI (payback in years, solved by bisection in [low, high]). NaN where the target cannot be reached.
+        '''
+        inputs = self._batch_inputs(scenarios, **dict(kwargs, bid_rate=kwargs.get('bid_rate', 0.0)))
+        if metric == 'Full ROI':
+            return self._bisect(inputs, 'bid_rate', target, metric, low, high, smallest=True, tol=tol, max_iter=max_iter)
+        if metric not in ['Real Return', 'Nominal Return']:
+            raise ValueError(f'Unknown metric {metric!r}.')
+
+        realized = metric == 'Real Return'
+        with np.errstate(divide='ignore', invalid='ignore'):
+            flows_zero = self.cash_flows(**dict(inputs, bid_rate=np.zeros(len(inputs['bid_rate']))))
+            flows_one = self.cash_flows(**dict(inputs, bid_rate=np.ones(len(inputs['bid_rate']))))
+            at_zero = flows_zero.overall(realized=realized)
+            slope = flows_one.overall(realized=realized) - at_zero
+            needed = flows_zero.overall_investment * (1 + target/100)**self.YOJANA_LENGTH
+            bid_rate = (needed - at_zero)/slope
+
+        return np.where((flows_zero.overall_investment > 0) & (slope > 0), bid_rate, np.nan)
+
+    def solve_loan_size(self, target: float, metric='Full ROI', scenarios=None, low=0.0, high=99.0, tol=1e-6, max_iter=100, **kwargs):
+        '''
+        loan_size (percent of project cost, like loan_amount) per scenario where metric reaches target, by bisection in [low, high].
+        metric is Full ROI (years), Real Return or Nominal Return (%).
+        The direction is read from the bracket ends: where the metric improves with the loan (the usual case, leverage
+        raises returns and shortens payback) this is the least loan reaching target, otherwise the largest.
+        high must stay below 100, since a 100% loan leaves no investment; NaN where no loan in the bracket reaches target.
+        '''
+        if metric not in ['Full ROI', 'Real Return', 'Nominal Return']:
+            raise ValueError(f'Unknown metric {metric!r}.')
+        if high >= 100:
+            raise ValueError('high must be below 100: a 100% loan leaves no investment.')
+        inputs = self._batch_inputs(scenarios, **dict(kwargs, loan_size=kwargs.get('loan_size', 0.0)))
+        n = len(inputs['loan_size'])
+        at_low = self._evaluate_inputs(dict(inputs, loan_size=np.full(n, float(low))))[metric]
+        at_high = self._evaluate_inputs(dict(inputs, loan_size=np.full(n, float(high))))[metric]
+        #NaN (no return, never recovered) counts as the worst value
+        if metric == 'Full ROI':
+            improves = np.nan_to_num(at_high, nan=np.inf) < np.nan_to_num(at_low, nan=np.inf)
+        else:
+            improves = np.nan_to_num(at_high, nan=-np.inf) > np.nan_to_num(at_low, nan=-np.inf)
+
+        return self._bisect(inputs, 'loan_size', target, metric, low, high, smallest=improves, tol=tol, max_iter=max_iter)
+
+    def _financing_block(self, inputs, metric, loan_sizes, terms, DCR_options, min_cash_flow, max_loan):
+        '''
+        Scores every (DCR option, loan_size, term) candidate of a block of projects, shape (N, DCR, loans, terms).
+        Financing only changes the EMI and the investment, so the totals are the financing-free totals minus
+        EMI x (sum of the years paid, deflated for real), with no year axis; payback is computed for feasible candidates only.
+        Infeasible candidates score NaN.
+        '''
+        years = self.YOJANA_LENGTH
+        inflation = self.curve('inflation')
+        base = self.gross_return_array(bid_rate=inputs['bid_rate'], project_size=inputs['project_size']) - self.land_cost_array(project_size=inputs['project_size'], cost_per_bigha_per_month=inputs['cost_per_bigha_per_month']) - self.expense_array(monthly_expenses=inputs['monthly_expenses'], raise_rate=inputs['raise_rate'])
+        base_real = base/inflation
+        #EMI years deflated: paid_real[T-1] is the real value of one unit paid in each of the first T years
+        paid_real = np.cumsum(1/inflation)[terms - 1]
+        rate = _per_year(inputs['bank_loan_rate'])
+        annuity = (rate)/(1 - (1 + rate)**(-1*terms)) #(N, terms)
+
+        #lowest yearly nominal amount: min of base over the EMI years minus the EMI, and over the years after
+        before = np.minimum.accumulate(base, axis=-1)[:, terms - 1]
+        after = np.concatenate([np.minimum.accumulate(base[:, ::-1], axis=-1)[:, ::-1], np.full((len(base), 1), np.inf)], axis=-1)[:, terms]
+
+        cost_per_mw = np.array([self.DCR if status else self.NON_DCR for status in DCR_options])
+        project_cost = inputs['project_size'][:, None]*cost_per_mw - inputs['subsidy_size'][:, None] #(N, DCR)
+        loan = project_cost[:, :, None]*(loan_sizes/100) #(N, DCR, loans)
+        investment = project_cost[:, :, None] - loan
+        emi = loan[..., None]*annuity[:, None, None, :] #(N, DCR, loans, terms)
+
+        feasible = np.broadcast_to((investment > 0)[..., None], emi.shape)
+        if max_loan is not None:
+            feasible = feasible & (loan <= max_loan)[..., None]
+        if min_cash_flow is not None:
+            feasible = feasible & (np.minimum(before[:, None, None, :] - emi, after[:, None, None, :]) >= min_cash_flow)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if metric == 'Full ROI':
+                score = np.full(emi.shape, np.nan)
+                n, d, l, t = np.nonzero(feasible)
+                #cumulative real amount per year: base minus the EMI deflated over the years paid so far
+                cumulative = np.cumsum(base_real, axis=-1)[n] - emi[n, d, l, t][:, None]*np.cumsum(1/inflation)[np.minimum(np.arange(years), terms[t][:, None] - 1)]
+                real_amount = np.diff(cumulative, axis=-1, prepend=0.0)
+                score[n, d, l, t] = self.payback_years(real_amount, investment[n, d, l])
+                return score
+            if metric == 'Real Return':
+                overall = np.cumsum(base_real, axis=-1)[:, -1, None, None, None] - emi*paid_real
+            else:
+                overall = np.cumsum(base, axis=-1)[:, -1, None, None, None] - emi*terms
+            score = self._annualized(overall, investment[..., None])
+
+        return np.where(feasible, score, np.nan)
+
+    def optimize_financing(self, scenarios=None, metric='Real Return', loan_sizes=np.arange(0, 101, 5), max_term=None, DCR_options=(True, False), min_cash_flow=None, max_loan=None, chunk_size=2**18, **kwargs):
+        '''
+        Best financing per project over a grid of loan_size (percent of project cost), pay_emi_in (whole years up to
+        max_term, by default the Yojana) and DCR_options, maximizing Real or Nominal Return or minimizing Full ROI.
+        Constraints: every yearly nominal amount at least min_cash_flow and the loan amount at most max_loan (INR);
+        the investment left after the loan must be positive, which rules out a 100% loan.
+        scenarios are like batch_evaluate's; their loan_size, pay_emi_in and DCR_status are ignored.
+        Candidates are scored chunk_size at a time; the chosen financing is re-evaluated exactly with batch_evaluate.
+        Returns a DataFrame of loan_size, pay_emi_in, DCR_status and the batch_summary columns, NaN where nothing is feasible.
+        '''
+        import pandas as pd
+
+        if metric not in ['Real Return', 'Nominal Return', 'Full ROI']:
+            raise ValueError(f'Unknown metric {metric!r}.')
+        inputs = self._batch_inputs(scenarios, **dict(kwargs, loan_size=0.0, pay_emi_in=1))
+        loan_sizes = np.asarray(loan_sizes, dtype=float)
+        terms = np.arange(1, (self.YOJANA_LENGTH if max_term is None else min(max_term, self.YOJANA_LENGTH)) + 1)
+        DCR_options = np.asarray(DCR_options, dtype=bool)
+        n = len(inputs['bid_rate'])
+        candidates = len(DCR_options)*len(loan_sizes)*len(terms)
+        block = max(1, chunk_size//(candidates*(self.YOJANA_LENGTH if metric == 'Full ROI' else 1)))
+
+        best = np.zeros(n, dtype=int)
+        found = np.zeros(n, dtype=bool)
+        for start in range(0, n, block):
+            rows = slice(start, start + block)
+            score = self._financing_block({name: values[rows] for name, values in inputs.items()}, metric, loan_sizes, terms, DCR_options, min_cash_flow, max_loan).reshape(-1, candidates)
+            found[rows] = ~np.isnan(score).all(axis=1)
+            score = np.where(np.isnan(score), np.inf if metric == 'Full ROI' else -np.inf, score)
+            best[rows] = score.argmin(axis=1) if metric == 'Full ROI' else score.argmax(axis=1)
+        d, l, t = np.unravel_index(best, (len(DCR_options), len(loan_sizes), len(terms)))
+
+        chosen = dict(inputs, loan_size=loan_sizes[l], pay_emi_in=terms[t], DCR_status=DCR_options[d])
+        summary = self.batch_summary(chosen)
+        summary.insert(0, 'DCR_status', pd.array(chosen['DCR_status'], dtype='boolean'))
+        summary.insert(0, 'pay_emi_in', pd.array(chosen['pay_emi_in'], dtype='Int64'))
+        summary.insert(0, 'loan_size', chosen['loan_size'])
+        summary.loc[~found] = None
+        if isinstance(scenarios, pd.DataFrame):
+            summary.index = scenarios.index
+
+        return summary
+
+    def batch_summary(self, scenarios=None, cache=None, **kwargs):
+        '''
+        Per-scenario totals, annualized returns and payback of batch_evaluate as a DataFrame.
+        '''
+        import pandas as pd
+
+        results = self.batch_evaluate(scenarios, cache=cache, **kwargs)
+        summary = pd.DataFrame({name: results[name] for name in ['Overall Investment', 'Overall Nominal', 'Overall Real', 'Nominal Return', 'Real Return', 'Full ROI']})
+        if isinstance(scenarios, pd.DataFrame):
+            summary.index = scenarios.index
+
+        return summary
+
+    def _report_figure(self, flows: CashFlows, path: str):
+        '''
+        figure_total for a report, drawn with the object-oriented API on an Agg canvas so no pyplot state is touched.
+        '''
+        from matplotlib.figure import Figure
+
+        figure = Figure(figsize=(15, 6))
+        axes = figure.subplots()
+        for amount in [flows.emi, flows.nominal_amount, flows.real_amount]:
+            axes.plot(flows.year, amount/1e5)
+        for amount in [flows.emi, flows.nominal_amount, flows.real_amount]:
+            axes.scatter(flows.year, amount/1e5)
+        axes.legend(['EMI', 'Nominal Amount', 'Real Amount'])
+        axes.set_xlabel('Year')
+        axes.set_ylabel('In Lakhs')
+        axes.grid(True)
+        figure.savefig(path)
+
+    def _latex_content(self, bid_rate, project_size, loan_size, pay_emi_in, subsidy_size, DCR_status, raise_rate, flows: CashFlows, figure_name='figure_total.png'):
+        '''
+        The LaTeX source of a report, from already computed cash flows.
+        '''
+        nominal_return = flows.nominal_amount
+        realized_return = flows.real_amount
+        land_cost = flows.land_cost
+        expense_cost = flows.expense_cost
         land_needed = self.land_need(project_size=project_size)
-        expense_cost = self.expenses(monthly_expenses=monthly_expenses, raise_rate=raise_rate)['Expense Cost']
+        overall_investment = float(flows.overall_investment)
+        full_roi_output = float(self.payback_years(realized_return, overall_investment))
 
         if DCR_status:
             DCR_Cost = self.DCR
         else:
             DCR_Cost = self.NON_DCR
 
-        overall_nom = nominal_return.sum()
-        overall_real = realized_return.sum()
+        overall_nom = float(flows.overall(realized=False))
+        overall_real = float(flows.overall(realized=True))
+        nom_return = (((overall_nom/overall_investment)**(1/self.YOJANA_LENGTH))-1)*100
+        real_return = (((overall_real/overall_investment)**(1/self.YOJANA_LENGTH))-1)*100
 
-
-        real_return = self._annualized_return(bid_rate=bid_rate, project_size=project_size, loan_size=loan_size, pay_emi_in=pay_emi_in, subsidy_size=subsidy_size, realized=True, DCR_status=DCR_status, cost_per_bigha_per_month = cost_per_bigha_per_month)
-        nom_return = self._annualized_return(bid_rate=bid_rate, project_size=project_size, loan_size=loan_size, pay_emi_in=pay_emi_in, subsidy_size=subsidy_size, realized=False, DCR_status=DCR_status, cost_per_bigha_per_month = cost_per_bigha_per_month)
-        # LaTeX document content
         latex_content = f"""
         \\documentclass[10pt]{{article}}
         \\usepackage[left=0.5cm,right=0.5cm,top=0.5cm,bottom=0.5cm]{{geometry}}
@@ -386,8 +966,8 @@ class PMYojana():
         % Include image
         \\begin{{figure}}[!htb]
         \\centering
-        \\includegraphics[width=\\textwidth]{{figure_total.png}}
-        \\caption{{Total Returns over 25 years}}
+        \\includegraphics[width=\\textwidth]{{{figure_name}}}
+        \\caption{{Total Returns over {self.YOJANA_LENGTH} years}}
         \\end{{figure}}
         
         % Start multicol for table and full ROI output
@@ -422,16 +1002,29 @@ class PMYojana():
         latex_content += f"\\item\\textbf{{Overall Nominal Return}}: \\rupee~{round(overall_nom, 0)}"
         latex_content += f"\\item\\textbf{{Overall Real Return}}: \\rupee~{round(overall_real, 0)} over {round(self.INFLATION*100, 2)}\\% inflation"
         latex_content += f"\\newline"
-        latex_content += f"\\item\\textbf{{Nominal Returns}}: {round(nom_return, 2)}\\% returns over 25 years"
-        latex_content += f"\\item\\textbf{{Real Returns}}: {round(real_return, 2)}\\% returns over {round(self.INFLATION*100, 2)}\\% inflation over 25 years"
+        latex_content += f"\\item\\textbf{{Nominal Returns}}: {round(nom_return, 2)}\\% returns over {self.YOJANA_LENGTH} years"
+        latex_content += f"\\item\\textbf{{Real Returns}}: {round(real_return, 2)}\\% returns over {round(self.INFLATION*100, 2)}\\% inflation over {self.YOJANA_LENGTH} years"
         latex_content += f"\\newline"
-        latex_content += f"\\item\\textbf{{Full ROI In}}: {round(full_roi_output, 1)} years"
+        latex_content += f"\\item\\textbf{{Full ROI In}}: {round(full_roi_output, 1)} years" if not np.isnan(full_roi_output) else f"\\item\\textbf{{Full ROI In}}: not within {self.YOJANA_LENGTH} years"
         # End multicol
         latex_content += "\\end{itemize}\\end{multicols}"
         
         # Complete LaTeX content
         latex_content += "\\end{document}"
 
+        return latex_content
+
+    def generate_latex_report(self, bid_rate: float, project_size: float, loan_size: float, pay_emi_in: int, subsidy_size: float, realized=True, DCR_status=True, cost_per_bigha_per_month = 3e4, monthly_expenses=5e4, raise_rate=1/2):
+        import subprocess
+
+        flows = self.cash_flows(bid_rate=bid_rate, project_size=project_size, loan_size=loan_size, pay_emi_in=pay_emi_in, subsidy_size=subsidy_size, DCR_status=DCR_status, cost_per_bigha_per_month=cost_per_bigha_per_month, monthly_expenses=monthly_expenses, raise_rate=raise_rate)
+
+        # Generate image
+        self._report_figure(flows, "figure_total.png")
+        self.annualized_return(bid_rate=bid_rate, project_size=project_size, loan_size=loan_size, pay_emi_in=pay_emi_in, subsidy_size=subsidy_size, realized=realized, DCR_status=DCR_status, cost_per_bigha_per_month = cost_per_bigha_per_month, monthly_expenses=monthly_expenses, raise_rate=raise_rate)
+
+        latex_content = self._latex_content(bid_rate, project_size, loan_size, pay_emi_in, subsidy_size, DCR_status, raise_rate, flows)
+
         # Write content to a .tex file
         with open("report.tex", "w") as f:
             f.write(latex_content)
@@ -440,3 +1033,60 @@ class PMYojana():
         subprocess.run(["pdflatex", "report.tex"])
 
         print("PDF report generated successfully.")
+
+    def generate_latex_reports(self, scenarios, output_dir='reports', names=None, workers=4, timeout=120):
+        '''
+        Bulk generate_latex_report: one PDF per scenario (a DataFrame/dict like batch_evaluate takes) in output_dir.
+        All numbers come from one vectorized pass. Each report is written in its own temporary directory and
+        compiled by a pool of at most workers concurrent pdflatex processes, each with a timeout.
+        Returns one dict per report with name, pdf (path or None), returncode and error (output tail on failure).
+        names, if given, are one unique file name per scenario made of letters, digits, '.', '_' and '-'.
+        '''
+        import re
+        import shutil
+        import subprocess
+        import tempfile
+        from concurrent.futures import ThreadPoolExecutor
+
+        inputs = self._batch_inputs(scenarios)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            flows = self.cash_flows(**inputs)
+        count = len(inputs['bid_rate'])
+        names = [f'report_{i}' for i in range(count)] if names is None else [str(name) for name in names]
+        if len(names) != count:
+            raise ValueError(f'Got {len(names)} names for {count} scenarios.')
+        if len(set(names)) != count:
+            raise ValueError('Report names must be unique, otherwise reports overwrite each other.')
+        unsafe = [name for name in names if not re.fullmatch(r'[A-Za-z0-9_.-]+', name) or name.strip('.') == '']
+        if unsafe:
+            raise ValueError(f'Report names must be plain file names: {unsafe[:10]}.')
+        os.makedirs(output_dir, exist_ok=True)
+
+        def compile_report(name, directory):
+            try:
+                completed = subprocess.run(['pdflatex', '-interaction=nonstopmode', '-halt-on-error', 'report.tex'], cwd=directory, capture_output=True, text=True, timeout=timeout)
+                if completed.returncode != 0:
+                    return {'name': name, 'pdf': None, 'returncode': completed.returncode, 'error': (completed.stdout + completed.stderr)[-2000:]}
+                pdf = os.path.join(output_dir, f'{name}.pdf')
+                shutil.move(os.path.join(directory, 'report.pdf'), pdf)
+                return {'name': name, 'pdf': pdf, 'returncode': 0, 'error': None}
+            except subprocess.TimeoutExpired:
+                return {'name': name, 'pdf': None, 'returncode': None, 'error': f'pdflatex timed out after {timeout}s'}
+            except OSError as error:
+                return {'name': name, 'pdf': None, 'returncode': None, 'error': str(error)}
+            finally:
+                shutil.rmtree(directory, ignore_errors=True)
+
+        jobs = []
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for i in range(count):
+                row = CashFlows(flows.year, *[getattr(flows, stage)[i] for stage in CashFlows.PERIODIC], flows.overall_investment[i])
+                directory = tempfile.mkdtemp(prefix=f'{names[i]}_')
+                self._report_figure(row, os.path.join(directory, 'figure_total.png'))
+                params = [inputs[name][i] for name in ['bid_rate', 'project_size', 'loan_size', 'pay_emi_in', 'subsidy_size', 'DCR_status', 'raise_rate']]
+                with open(os.path.join(directory, 'report.tex'), 'w') as f:
+                    f.write(self._latex_content(*[param.item() for param in params], row))
+                #figures for the next reports are drawn while earlier ones compile
+                jobs.append(pool.submit(compile_report, names[i], directory))
+
+        return [job.result() for job in jobs]
@@ -0,0 +1,96 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import numpy as np
+
+from code import load_scenarios
+
+async def _request(reader, writer, method, path, payload=None):
+    body = b'' if payload is None else json.dumps(payload).encode()
+    writer.write(f'{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n'.encode() + body)
+    await writer.drain()
+    status = await reader.readline()
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    data = await reader.readexactly(int(headers['content-length']))
+    return status.split()[1].decode(), json.loads(data)
+
+async def _connect(host, port, unix_socket):
+    if unix_socket:
+        return await asyncio.open_unix_connection(unix_socket)
+    return await asyncio.open_connection(host, port)
+
+async def _client(host, port, unix_socket, scenarios, requests, latencies, rng):
+    reader, writer = await _connect(host, port, unix_socket)
+    try:
+        for _ in range(requests):
+            scenario = scenarios[rng.randrange(len(scenarios))]
+            start = time.perf_counter()
+            status, _ = await _request(reader, writer, 'POST', '/score', scenario)
+            if status != '200':
+                raise RuntimeError(f'/score returned {status}')
+            latencies.append(time.perf_counter() - start)
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+async def run(host='127.0.0.1', port=8765, unix_socket=None, clients=64, requests=200, distinct=500, seed=0, serve=False):
+    '''
+    clients concurrent keep-alive connections each send requests single-scenario /score calls, drawn from the
+    first distinct forCode.csv rows (so repeats exercise the cache). With serve=True the service runs in-process.
+    Returns client-side throughput and latency percentiles plus the service's /metrics.
+    '''
+    server = None
+    if serve:
+        from service import ScoringService
+
+        server = await ScoringService().start(host, port, unix_socket)
+    scenarios = load_scenarios().head(distinct).drop(columns='target').to_dict('records')
+    scenarios = [{name: (value.item() if hasattr(value, 'item') else value) for name, value in scenario.items()} for scenario in scenarios]
+    latencies = []
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    await asyncio.gather(*[_client(host, port, unix_socket, scenarios, requests, latencies, random.Random(rng.random())) for _ in range(clients)])
+    seconds = time.perf_counter() - start
+
+    reader, writer = await _connect(host, port, unix_socket)
+    _, metrics = await _request(reader, writer, 'GET', '/metrics')
+    writer.close()
+    await writer.wait_closed()
+    if server is not None:
+        server.close()
+        await server.wait_closed()
+    latencies = np.array(latencies) * 1000
+
+    return {
+        'requests': len(latencies),
+        'requests_per_s': len(latencies)/seconds,
+        'client_latency_ms_p50': float(np.percentile(latencies, 50)),
+        'client_latency_ms_p99': float(np.percentile(latencies, 99)),
+        'service': metrics,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test for service.py.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix-socket')
+    parser.add_argument('--clients', type=int, default=64)
+    parser.add_argument('--requests', type=int, default=200, help='requests per client')
+    parser.add_argument('--distinct', type=int, default=500, help='number of distinct scenarios to draw from')
+    parser.add_argument('--serve', action='store_true', help='run the service in this process')
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.host, args.port, args.unix_socket, args.clients, args.requests, args.distinct, serve=args.serve))
+    print(json.dumps(results, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,212 @@
+import itertools
+
+import numpy as np
+
+from code import PMYojana, SCENARIO_COLUMNS, SCENARIO_DEFAULTS
+
+class Portfolio():
+    '''
+    Many projects under the scheme in a columnar table: one array per scenario parameter plus each project's
+    yearly nominal and real amounts and investment, grown by doubling like a list.
+    The combined yearly cash flows and investment are running totals, so add, remove and update only evaluate
+    (and add or subtract) the projects they touch. Changing a model constant re-evaluates every project.
+    Projects are addressed by the ids given to add, or by consecutive integers.
+    '''
+    def __init__(self, projects=None, model=None, capacity=1024, **kwargs) -> None:
+        self.model = PMYojana() if model is None else model
+        self.size = 0
+        self.ids = []
+        self.index = {}
+        self._next_id = itertools.count()
+        self._allocate(capacity)
+        self._constants = self._model_constants()
+        self.refresh()
+        if projects is not None or kwargs:
+            self.add(projects, **kwargs)
+
+    def __len__(self):
+        return self.size
+
+    def _model_constants(self):
+        return tuple(getattr(self.model, name) for name in self.model.MODEL_CONSTANTS)
+
+    def _allocate(self, capacity):
+        years = self.model.YOJANA_LENGTH
+        params = {name: np.empty(capacity, dtype=int if name == 'pay_emi_in' else bool if name == 'DCR_status' else float) for name in SCENARIO_COLUMNS + list(SCENARIO_DEFAULTS)}
+        nominal, real, investment = np.empty((capacity, years)), np.empty((capacity, years)), np.empty(capacity)
+        if self.size:
+            for name in params:
+                params[name][:self.size] = self.params[name][:self.size]
+            if self.nominal.shape[1] == years:
+                nominal[:self.size] = self.nominal[:self.size]
+                real[:self.size] = self.real[:self.size]
+            investment[:self.size] = self.investment[:self.size]
+        self.params, self.nominal, self.real, self.investment = params, nominal, real, investment
+
+    def _evaluate(self, inputs):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            flows = self.model.cash_flows(**inputs)
+        return flows.nominal_amount, flows.real_amount, flows.overall_investment
+
+    def _write(self, rows, inputs):
+        nominal, real, investment = self._evaluate(inputs)
+        for name, values in inputs.items():
+            self.params[name][rows] = values
+        self.nominal[rows] = nominal
+        self.real[rows] = real
+        self.investment[rows] = investment
+        return nominal, real, investment
+
+    def _check_constants(self):
+        constants = self._model_constants()
+        if constants != self._constants:
+            self._constants = constants
+            rows = slice(0, self.size)
+            inputs = {name: values[rows] for name, values in self.params.items()}
+            if self.nominal.shape[1] != self.model.YOJANA_LENGTH:
+                self._allocate(len(self.investment))
+            self._write(rows, inputs)
+            self.refresh()
+
+    def refresh(self):
+        '''
+        Recomputes the running totals from the stored projects, dropping any rounding drift from many updates.
+        '''
+        self.total_nominal = self.nominal[:self.size].sum(axis=0)
+        self.total_real = self.real[:self.size].sum(axis=0)
+        self.total_investment = self.investment[:self.size].sum()
+
+    def _rows(self, ids):
+        ids = [ids] if np.ndim(ids) == 0 else list(ids)
+        #a repeated id would be subtracted or updated twice
+        if len(set(ids)) != len(ids):
+            raise ValueError('ids must be unique.')
+        missing = [project for project in ids if project not in self.index]
+        if missing:
+            raise KeyError(f'Unknown projects: {missing[:10]}.')
+        return ids, np.array([self.index[project] for project in ids], dtype=int)
+
+    def add(self, projects=None, ids=None, **kwargs):
+        '''
+        Adds projects given like batch_evaluate scenarios (a DataFrame or dict, keyword arrays override it).
+        Returns their ids.
+        '''
+        self._check_constants()
+        inputs = self.model._batch_inputs(projects, **kwargs)
+        count = len(inputs['bid_rate'])
+        ids = [next(self._next_id) for _ in range(count)] if ids is None else list(ids)
+        if len(ids) != count or len(set(ids)) != count:
+            raise ValueError('ids must be unique and one per project.')
+        duplicate = [project for project in ids if project in self.index]
+        if duplicate:
+            raise ValueError(f'Projects already in the portfolio: {duplicate[:10]}.')
+
+        if self.size + count > len(self.investment):
+            self._allocate(max(2*len(self.investment), self.size + count))
+        rows = slice(self.size, self.size + count)
+        nominal, real, investment = self._write(rows, inputs)
+        self.total_nominal = self.total_nominal + nominal.sum(axis=0)
+        self.total_real = self.total_real + real.sum(axis=0)
+        self.total_investment = self.total_investment + investment.sum()
+        self.index.update(zip(ids, range(self.size, self.size + count)))
+        self.ids.extend(ids)
+        self.size += count
+
+        return ids
+
+    def remove(self, ids):
+        '''
+        Removes projects; the last rows are moved into the freed ones so the table stays contiguous.
+        '''
+        self._check_constants()
+        ids, rows = self._rows(ids)
+        self.total_nominal = self.total_nominal - self.nominal[rows].sum(axis=0)
+        self.total_real = self.total_real - self.real[rows].sum(axis=0)
+        self.total_investment = self.total_investment - self.investment[rows].sum()
+
+        size = self.size - len(rows)
+        holes = np.sort(rows[rows < size])
+        movers = np.setdiff1d(np.arange(size, self.size), rows)
+        for values in list(self.params.values()) + [self.nominal, self.real, self.investment]:
+            values[holes] = values[movers]
+        for project in ids:
+            del self.index[project]
+        for hole, mover in zip(holes.tolist(), movers.tolist()):
+            self.ids[hole] = self.ids[mover]
+            self.index[self.ids[hole]] = hole
+        del self.ids[size:]
+        self.size = size
+        if size == 0:
+            self.refresh()
+
+    def update(self, ids, **kwargs):
+        '''
+        Changes parameters of some projects (scalars or one value per id) and re-evaluates only those.
+        '''
+        self._check_constants()
+        for name in kwargs:
+            if name not in self.params:
+                raise TypeError(f'Unknown scenario parameter {name!r}.')
+        ids, rows = self._rows(ids)
+        current = {name: values[rows] for name, values in self.params.items()}
+        inputs = self.model._batch_inputs(current, **kwargs)
+        old_nominal, old_real, old_investment = self.nominal[rows], self.real[rows], self.investment[rows]
+        nominal, real, investment = self._write(rows, inputs)
+        self.total_nominal = self.total_nominal + (nominal.sum(axis=0) - old_nominal.sum(axis=0))
+        self.total_real = self.total_real + (real.sum(axis=0) - old_real.sum(axis=0))
+        self.total_investment = self.total_investment + (investment.sum() - old_investment.sum())
+
+    def table(self):
+        '''
+        The projects' parameters and investment as a DataFrame indexed by id.
+        '''
+        import pandas as pd
+
+        self._check_constants()
+        data = {name: values[:self.size] for name, values in self.params.items()}
+        data['Overall Investment'] = self.investment[:self.size]
+        return pd.DataFrame(data, index=pd.Index(self.ids, name='project'))
+
+    def yearly(self):
+        '''
+        Combined yearly nominal and real amounts of all projects.
+        '''
+        import pandas as pd
+
+        self._check_constants()
+        dictionary = {'Year': np.arange(1, self.model.YOJANA_LENGTH + 1), 'Nominal Amount': self.total_nominal, 'Real Amount': self.total_real}
+        return pd.DataFrame.from_dict(dictionary)
+
+    def irr(self, realized=True):
+        '''
+        Rate in percent at which the combined investment (paid up front) and yearly amounts have zero present value.
+        NaN when there is no such rate above -100%.
+        '''
+        self._check_constants()
+        amount = self.total_real if realized else self.total_nominal
+        #sum(amount[t] * x**(t+1)) - investment = 0 with x = 1/(1 + rate), highest power first for np.roots
+        roots = np.roots(np.concatenate([amount[::-1], [-self.total_investment]]))
+        roots = roots[(np.abs(roots.imag) < 1e-9) & (roots.real > 0)].real
+        if len(roots) == 0:
+            return np.nan
+        rates = 1/roots - 1
+        return float(rates[np.argmin(np.abs(rates))]*100)
+
+    def summary(self):
+        '''
+        Portfolio totals, annualized returns (as batch_evaluate defines them, on the combined amounts), IRRs and payback.
+        '''
+        self._check_constants()
+        overall_nominal = np.cumsum(self.total_nominal)[-1]
+        overall_real = np.cumsum(self.total_real)[-1]
+        return {
+            'Projects': self.size,
+            'Overall Investment': float(self.total_investment),
+            'Overall Nominal': float(overall_nominal),
+            'Overall Real': float(overall_real),
+            'Nominal Return': float(self.model._annualized(overall_nominal, self.total_investment)),
+            'Real Return': float(self.model._annualized(overall_real, self.total_investment)),
+            'Nominal IRR': self.irr(realized=False),
+            'Real IRR': self.irr(realized=True),
+            'Full ROI': float(self.model.payback_years(self.total_real, self.total_investment)),
+        }
@@ -0,0 +1,104 @@
+import hashlib
+import sqlite3
+import time
+
+import numpy as np
+
+from code import SCENARIO_COLUMNS, SCENARIO_DEFAULTS
+
+#Bump when the model's formulas change, so old entries stop matching
+SCHEMA = 'pmyojana-results-v2'
+YEARLY = ['Gross Return', 'EMI', 'Land Cost', 'Expense Cost', 'Nominal Amount', 'Real Amount']
+SCALARS = ['Overall Investment', 'Overall Nominal', 'Overall Real', 'Nominal Return', 'Real Return', 'Full ROI']
+_SCALAR_COLUMNS = ', '.join(f'"{name}"' for name in SCALARS)
+
+class ResultCache():
+    '''
+    Persistent content-addressed cache of batch_evaluate outputs in SQLite.
+    Each scenario is keyed on a hash of its parameters and the model constants; its yearly cash flows are stored as
+    one blob next to the per-scenario figures. At most max_entries are kept, evicting the least recently used.
+    WAL mode and a busy timeout make it safe to share one file between worker processes (one ResultCache each).
+    Pass it as batch_evaluate(..., cache=ResultCache(path)) to compute only the misses.
+    '''
+    def __init__(self, path='pmyojana_cache.sqlite', max_entries=1000000, timeout=30.0) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.connection = sqlite3.connect(path, timeout=timeout)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        with self.connection:
+            self.connection.execute(f'CREATE TABLE IF NOT EXISTS results (key BLOB PRIMARY KEY, yearly BLOB, {_SCALAR_COLUMNS}, last_used REAL)')
+            self.connection.execute('CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)')
+
+    def keys(self, model, inputs):
+        '''
+        One 16-byte hash per scenario of the normalized inputs, the model constants and SCHEMA.
+        '''
+        constants = np.array([getattr(model, name) for name in model.MODEL_CONSTANTS], dtype=float).tobytes() + SCHEMA.encode()
+        params = np.column_stack([np.asarray(inputs[name], dtype=float) for name in SCENARIO_COLUMNS + list(SCENARIO_DEFAULTS)])
+        return [hashlib.blake2b(row.tobytes() + constants, digest_size=16).digest() for row in params]
+
+    def _fetch(self, keys):
+        found = {}
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ', '.join('?' * len(chunk))
+            for key, yearly, *scalars in self.connection.execute(f'SELECT key, yearly, {_SCALAR_COLUMNS} FROM results WHERE key IN ({placeholders})', chunk):
+                found[key] = (yearly, scalars)
+        if found:
+            now = time.time()
+            with self.connection:
+                self.connection.executemany('UPDATE results SET last_used = ? WHERE key = ?', [(now, key) for key in found])
+        return found
+
+    def _store(self, keys, results, rows):
+        now = time.time()
+        records = []
+        for i, key in zip(rows, keys):
+            yearly = np.stack([results[name][i] for name in YEARLY]).astype(float).tobytes()
+            records.append((key, yearly, *[float(results[name][i]) for name in SCALARS], now))
+        with self.connection:
+            placeholders = ', '.join('?' * (len(SCALARS) + 3))
+            self.connection.executemany(f'INSERT OR REPLACE INTO results VALUES ({placeholders})', records)
+            count = self.connection.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+            if count > self.max_entries:
+                #evict down to 90% so eviction does not run on every insert
+                self.connection.execute('DELETE FROM results WHERE key IN (SELECT key FROM results ORDER BY last_used LIMIT ?)', (count - int(self.max_entries * 0.9),))
+
+    def evaluate(self, model, inputs):
+        '''
+        batch_evaluate for normalized inputs, reading hits from the cache and computing only the misses.
+        '''
+        keys = self.keys(model, inputs)
+        found = self._fetch(keys)
+        missing = [i for i, key in enumerate(keys) if key not in found]
+        self.hits += len(keys) - len(missing)
+        self.misses += len(missing)
+
+        n, years = len(keys), model.YOJANA_LENGTH
+        results = {'Year': np.arange(1, years + 1)}
+        results.update({name: np.empty((n, years)) for name in YEARLY})
+        results.update({name: np.empty(n) for name in SCALARS})
+        for i, key in enumerate(keys):
+            if key in found:
+                yearly, scalars = found[key]
+                yearly = np.frombuffer(yearly).reshape(len(YEARLY), years)
+                for j, name in enumerate(YEARLY):
+                    results[name][i] = yearly[j]
+                for name, value in zip(SCALARS, scalars):
+                    results[name][i] = np.nan if value is None else value
+        if missing:
+            computed = model._evaluate_inputs({name: values[missing] for name, values in inputs.items()})
+            for name in YEARLY + SCALARS:
+                results[name][missing] = computed[name]
+            self._store([keys[i] for i in missing], computed, range(len(missing)))
+
+        return results
+
+    def info(self):
+        return {'hits': self.hits, 'misses': self.misses, 'entries': self.connection.execute('SELECT COUNT(*) FROM results').fetchone()[0]}
+
+    def close(self):
+        self.connection.close()
@@ -0,0 +1,150 @@
+import collections
+
+import numpy as np
+
+from code import PMYojana, SCENARIO_COLUMNS, SCENARIO_DEFAULTS
+
+#Stage -> (scenario parameters it reads, stages it reads); the results of batch_evaluate plus the loan amount
+STAGES = {
+    'Loan Amount': (('project_size', 'DCR_status', 'loan_size', 'subsidy_size'), ()),
+    'Gross Return': (('bid_rate', 'project_size'), ()),
+    'EMI': (('pay_emi_in', 'bank_loan_rate'), ('Loan Amount',)),
+    'Land Cost': (('project_size', 'cost_per_bigha_per_month'), ()),
+    'Expense Cost': (('monthly_expenses', 'raise_rate'), ()),
+    'Nominal Amount': ((), ('Gross Return', 'EMI', 'Land Cost', 'Expense Cost')),
+    'Real Amount': ((), ('Nominal Amount',)),
+    'Overall Investment': (('project_size', 'DCR_status', 'subsidy_size'), ('Loan Amount',)),
+    'Overall Nominal': ((), ('Nominal Amount',)),
+    'Overall Real': ((), ('Real Amount',)),
+    'Nominal Return': ((), ('Overall Nominal', 'Overall Investment')),
+    'Real Return': ((), ('Overall Real', 'Overall Investment')),
+    'Full ROI': ((), ('Real Amount', 'Overall Investment')),
+}
+
+def _downstream():
+    '''
+    Parameter -> every stage that has to be recomputed when it changes, in dependency order.
+    '''
+    affected = {}
+    for name in SCENARIO_COLUMNS + list(SCENARIO_DEFAULTS):
+        stages = set()
+        for stage, (params, inputs) in STAGES.items():
+            if name in params or stages.intersection(inputs):
+                stages.add(stage)
+        affected[name] = [stage for stage in STAGES if stage in stages]
+    return affected
+
+AFFECTED = _downstream()
+
+class Scenario():
+    '''
+    A scenario (scalars) or a batch of scenarios (equal length arrays) whose stages are computed on demand and
+    kept until an input changes. Setting a parameter, e.g. scenario.monthly_expenses = 6e4 or scenario.update(...),
+    only drops the stages downstream of it in STAGES; changing a model constant drops them all.
+    recomputations counts how often each stage was computed.
+    '''
+    def __init__(self, scenarios=None, model=None, **kwargs) -> None:
+        model = PMYojana() if model is None else model
+        inputs = model._batch_inputs(scenarios, **kwargs)
+        single = scenarios is None and all(np.ndim(value) == 0 for value in kwargs.values())
+        object.__setattr__(self, 'model', model)
+        object.__setattr__(self, 'single', single)
+        object.__setattr__(self, 'params', {name: (values[0] if single else values) for name, values in inputs.items()})
+        object.__setattr__(self, 'stages', {})
+        object.__setattr__(self, 'recomputations', collections.Counter())
+        object.__setattr__(self, '_constants', None)
+
+    def __getattr__(self, name):
+        params = self.__dict__.get('params', {})
+        if name in params:
+            return params[name]
+        raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        if name in self.params:
+            self.update(**{name: value})
+        else:
+            object.__setattr__(self, name, value)
+
+    def update(self, **kwargs):
+        '''
+        Sets scenario parameters and drops the stages that depend on the ones that changed.
+        For a batch, a value is a scalar for every scenario or an array of the batch's length.
+        '''
+        for name, value in kwargs.items():
+            if name not in self.params:
+                raise TypeError(f'Unknown scenario parameter {name!r}.')
+            old = self.params[name]
+            value = np.asarray(value, dtype=float)
+            if not self.single:
+                value = np.broadcast_to(value, old.shape).copy()
+            if name == 'pay_emi_in':
+                value = value.astype(int)
+            elif name == 'DCR_status':
+                value = value.astype(bool)
+            if self.single:
+                value = value[()]
+            if np.array_equal(value, old):
+                continue
+            self.params[name] = value
+            for stage in AFFECTED[name]:
+                self.stages.pop(stage, None)
+
+        return self
+
+    def _check_constants(self):
+        constants = tuple(getattr(self.model, name) for name in self.model.MODEL_CONSTANTS)
+        if constants != self._constants:
+            self.stages.clear()
+            object.__setattr__(self, '_constants', constants)
+
+    def __getitem__(self, stage):
+        '''
+        The value of a stage, computing it (and any missing stage it reads) if needed.
+        '''
+        if stage not in STAGES:
+            raise KeyError(stage)
+        self._check_constants()
+        return self._stage(stage)
+
+    def _stage(self, stage):
+        if stage not in self.stages:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                self.stages[stage] = self._compute(stage)
+            self.recomputations[stage] += 1
+        return self.stages[stage]
+
+    def _compute(self, stage):
+        model, p, get = self.model, self.params, self._stage
+        if stage == 'Loan Amount':
+            return model._loan_amount_array(project_size=p['project_size'], DCR_status=p['DCR_status'], loan_size=p['loan_size'], subsidy_size=p['subsidy_size'])
+        if stage == 'Gross Return':
+            return model.gross_return_array(bid_rate=p['bid_rate'], project_size=p['project_size'])
+        if stage == 'EMI':
+            return model._emi_from_loan(get('Loan Amount'), pay_emi_in=p['pay_emi_in'], bank_loan_rate=p['bank_loan_rate'])
+        if stage == 'Land Cost':
+            return model.land_cost_array(project_size=p['project_size'], cost_per_bigha_per_month=p['cost_per_bigha_per_month'])
+        if stage == 'Expense Cost':
+            return model.expense_array(monthly_expenses=p['monthly_expenses'], raise_rate=p['raise_rate'])
+        if stage == 'Nominal Amount':
+            return get('Gross Return') - get('EMI') - get('Land Cost') - get('Expense Cost')
+        if stage == 'Real Amount':
+            return get('Nominal Amount') / model.curve('inflation')
+        if stage == 'Overall Investment':
+            return model._investment_from_loan(project_size=p['project_size'], DCR_status=p['DCR_status'], subsidy_size=p['subsidy_size'], loan_amount=get('Loan Amount'))
+        if stage in ('Overall Nominal', 'Overall Real'):
+            amount = get('Nominal Amount' if stage == 'Overall Nominal' else 'Real Amount')
+            return np.cumsum(amount, axis=-1)[..., -1]
+        if stage in ('Nominal Return', 'Real Return'):
+            return model._annualized(get('Overall Nominal' if stage == 'Nominal Return' else 'Overall Real'), get('Overall Investment'))
+        if stage == 'Full ROI':
+            return model.payback_years(get('Real Amount'), get('Overall Investment'))
+
+    def results(self):
+        '''
+        Every stage of batch_evaluate's output, recomputing only what is out of date.
+        '''
+        self._check_constants()
+        results = {'Year': np.arange(1, self.model.YOJANA_LENGTH + 1)}
+        results.update({stage: self._stage(stage) for stage in STAGES if stage != 'Loan Amount'})
+        return results
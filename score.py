@@ -0,0 +1,137 @@
+import argparse
+import collections
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from code import PMYojana, SCENARIO_COLUMNS
+
+#Columns appended to every scored row
+OUTPUT_COLUMNS = ['Overall Investment', 'Overall Nominal', 'Overall Real', 'Nominal Return', 'Real Return', 'Full ROI']
+
+_model = None
+
+def score_chunk(chunk: pd.DataFrame):
+    '''
+    Scores one chunk of scenarios with the batch engine; one PMYojana (and curve cache) per process.
+    '''
+    global _model
+    if _model is None:
+        _model = PMYojana()
+    summary = _model.batch_summary(chunk)[OUTPUT_COLUMNS]
+
+    return pd.concat([chunk, summary], axis=1)
+
+def _score_for_output(chunk: pd.DataFrame, csv: bool):
+    '''
+    Scores a chunk and, for CSV output, also formats it in the worker: float formatting costs far more than scoring.
+    Returns (row count, columns, CSV text or DataFrame).
+    '''
+    scored = score_chunk(chunk)
+    if csv:
+        return len(scored), list(scored.columns), scored.to_csv(header=False, index=False)
+    return len(scored), list(scored.columns), scored
+
+def _has_header(path):
+    with open(path) as f:
+        first = f.readline().split(',')
+    try:
+        [float(value) for value in first]
+    except ValueError:
+        return True
+    return False
+
+def read_chunks(path, chunk_size):
+    '''
+    Streams scenarios from a CSV (headerless forCode.csv style or with SCENARIO_COLUMNS names) or a Parquet file.
+    '''
+    if path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+        return
+    header = _has_header(path)
+    for chunk in pd.read_csv(path, header=0 if header else None, chunksize=chunk_size):
+        if not header:
+            extra = [f'target_{i}' if i else 'target' for i in range(chunk.shape[1] - len(SCENARIO_COLUMNS))]
+            chunk.columns = SCENARIO_COLUMNS + extra
+        yield chunk
+
+class _Writer():
+    '''
+    Appends scored chunks, as CSV text or DataFrames from _score_for_output, to a CSV or Parquet file.
+    '''
+    def __init__(self, path) -> None:
+        self.path = path
+        self.csv = not path.endswith('.parquet')
+        self.file = None
+        self.parquet = None
+
+    def write(self, columns, scored):
+        if self.csv:
+            if self.file is None:
+                self.file = open(self.path, 'w', newline='')
+                self.file.write(','.join(columns) + '\n')
+            self.file.write(scored)
+        else:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(scored, preserve_index=False)
+            if self.parquet is None:
+                self.parquet = pq.ParquetWriter(self.path, table.schema)
+            self.parquet.write_table(table)
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+        if self.parquet is not None:
+            self.parquet.close()
+
+def score_file(input_path, output_path, chunk_size=50000, workers=1):
+    '''
+    Scores input_path chunk by chunk into output_path and returns (rows, seconds).
+    With workers > 1 at most 2*workers chunks are in flight, so memory does not depend on the input size.
+    '''
+    start = time.perf_counter()
+    rows = 0
+    writer = _Writer(output_path)
+    try:
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                pending = collections.deque()
+                for chunk in read_chunks(input_path, chunk_size):
+                    pending.append(pool.submit(_score_for_output, chunk, writer.csv))
+                    if len(pending) >= 2 * workers:
+                        count, columns, scored = pending.popleft().result()
+                        writer.write(columns, scored)
+                        rows += count
+                while pending:
+                    count, columns, scored = pending.popleft().result()
+                    writer.write(columns, scored)
+                    rows += count
+        else:
+            for chunk in read_chunks(input_path, chunk_size):
+                count, columns, scored = _score_for_output(chunk, writer.csv)
+                writer.write(columns, scored)
+                rows += count
+    finally:
+        writer.close()
+
+    return rows, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description='Score a forCode.csv style scenario file (CSV or Parquet) with the PMYojana batch engine.')
+    parser.add_argument('input', help='scenario file, .csv or .parquet')
+    parser.add_argument('output', help='scored file to write, .csv or .parquet')
+    parser.add_argument('--chunk-size', type=int, default=50000)
+    parser.add_argument('--workers', type=int, default=1)
+    args = parser.parse_args()
+
+    rows, seconds = score_file(args.input, args.output, chunk_size=args.chunk_size, workers=args.workers)
+    print(f'Scored {rows} rows in {seconds:.2f}s ({rows/seconds:.0f} rows/s).')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,217 @@
+import argparse
+import asyncio
+import collections
+import json
+import math
+import time
+
+import numpy as np
+
+from code import PMYojana, SCENARIO_COLUMNS, SCENARIO_DEFAULTS
+
+#Per-scenario outputs returned for every request
+RESULT_COLUMNS = ['Overall Investment', 'Overall Nominal', 'Overall Real', 'Nominal Return', 'Real Return', 'Full ROI']
+
+class LRUCache():
+    '''
+    Bounded mapping that evicts the least recently used entry, with hit/miss counters.
+    '''
+    def __init__(self, maxsize=100000) -> None:
+        self.maxsize = maxsize
+        self.data = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        if key in self.data:
+            self.data.move_to_end(key)
+            self.hits += 1
+            return self.data[key]
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        self.data[key] = value
+        self.data.move_to_end(key)
+        if len(self.data) > self.maxsize:
+            self.data.popitem(last=False)
+
+def normalize(scenario: dict):
+    '''
+    The parameter tuple of a scenario in SCENARIO_COLUMNS + SCENARIO_DEFAULTS order, with defaults filled in.
+    '''
+    unknown = set(scenario) - set(SCENARIO_COLUMNS) - set(SCENARIO_DEFAULTS)
+    if unknown:
+        raise ValueError(f'Unknown scenario parameters: {sorted(unknown)}.')
+    missing = [name for name in SCENARIO_COLUMNS if name not in scenario and name != 'DCR_status']
+    if missing:
+        raise ValueError(f'Missing scenario parameters: {missing}.')
+    values = {**SCENARIO_DEFAULTS, 'DCR_status': True, **scenario}
+    #rejected here so one bad scenario does not fail the others in its micro-batch
+    if int(values['pay_emi_in']) < 1:
+        raise ValueError(f"pay_emi_in must be at least 1 year, got {values['pay_emi_in']}.")
+    return tuple([float(values[name]) for name in SCENARIO_COLUMNS[:3]] + [int(values['pay_emi_in']), float(values['subsidy_size']), bool(values['DCR_status'])]
+                 + [float(values[name]) for name in SCENARIO_DEFAULTS])
+
+class ScoringService():
+    '''
+    Coalesces concurrent scoring requests into micro-batches of at most max_batch scenarios, waiting at most
+    max_wait seconds for a batch to fill, and scores each batch in one vectorized batch_evaluate pass.
+    Results are memoized in an LRU cache keyed on the normalized parameters and the model constants.
+    '''
+    def __init__(self, model=None, max_batch=1024, max_wait=0.002, cache_size=100000, latency_window=10000) -> None:
+        self.model = PMYojana() if model is None else model
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.cache = LRUCache(cache_size)
+        self.queue = None
+        self.latencies = collections.deque(maxlen=latency_window)
+        self.batch_sizes = collections.deque(maxlen=latency_window)
+        self.requests = 0
+
+    def _constants(self):
+        return tuple(getattr(self.model, name) for name in self.model.MODEL_CONSTANTS)
+
+    def _evaluate(self, params):
+        columns = SCENARIO_COLUMNS + list(SCENARIO_DEFAULTS)
+        results = self.model.batch_evaluate(**{name: [values[i] for values in params] for i, name in enumerate(columns)})
+        #JSON has no NaN or infinity: never recovered (NaN) and undefined returns (e.g. a 100% loan) become null
+        return [{name: (value if math.isfinite(value) else None) for name, value in zip(RESULT_COLUMNS, row)}
+                for row in np.column_stack([results[name] for name in RESULT_COLUMNS]).tolist()]
+
+    async def _batcher(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            #the same scenario may be queued twice in one batch; score it once
+            unique = list(dict.fromkeys(key for key, _ in batch))
+            self.batch_sizes.append(len(unique))
+            try:
+                results = dict(zip(unique, await loop.run_in_executor(None, self._evaluate, [params for params, _ in unique])))
+            except Exception as error:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(error)
+                continue
+            for key, result in results.items():
+                self.cache.put(key, result)
+            for key, future in batch:
+                if not future.done():
+                    future.set_result(results[key])
+
+    async def score(self, scenarios):
+        '''
+        Scores a list of scenario dicts, from the cache where possible.
+        '''
+        start = time.perf_counter()
+        constants = self._constants()
+        keys = [(normalize(scenario), constants) for scenario in scenarios]
+        results = [self.cache.get(key) for key in keys]
+        pending = {}
+        loop = asyncio.get_running_loop()
+        for key, result in zip(keys, results):
+            if result is None and key not in pending:
+                pending[key] = loop.create_future()
+                await self.queue.put((key, pending[key]))
+        if pending:
+            await asyncio.gather(*pending.values())
+        results = [pending[key].result() if result is None else result for key, result in zip(keys, results)]
+        self.requests += 1
+        self.latencies.append(time.perf_counter() - start)
+
+        return results
+
+    def metrics(self):
+        latencies = np.array(self.latencies) * 1000
+        lookups = self.cache.hits + self.cache.misses
+        return {
+            'requests': self.requests,
+            'latency_ms_p50': float(np.percentile(latencies, 50)) if len(latencies) else None,
+            'latency_ms_p99': float(np.percentile(latencies, 99)) if len(latencies) else None,
+            'batches': len(self.batch_sizes),
+            'batch_size_mean': float(np.mean(self.batch_sizes)) if self.batch_sizes else None,
+            'batch_size_max': max(self.batch_sizes) if self.batch_sizes else None,
+            'cache_size': len(self.cache.data),
+            'cache_hit_rate': self.cache.hits/lookups if lookups else None,
+        }
+
+    async def _handle(self, reader, writer):
+        '''
+        Minimal HTTP/1.1 with keep-alive: POST /score with a scenario or a list of them, GET /metrics.
+        '''
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode('latin-1').split(' ', 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get('content-length', 0)))
+                status, payload = await self._route(method, path, body)
+                data = json.dumps(payload, allow_nan=False).encode()
+                writer.write(f'HTTP/1.1 {status}\r\nContent-Type: application/json\r\nContent-Length: {len(data)}\r\n\r\n'.encode() + data)
+                await writer.drain()
+                if headers.get('connection', '').lower() == 'close':
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, method, path, body):
+        if method == 'GET' and path == '/metrics':
+            return '200 OK', self.metrics()
+        if method == 'POST' and path == '/score':
+            try:
+                scenarios = json.loads(body)
+                single = isinstance(scenarios, dict)
+                results = await self.score([scenarios] if single else scenarios)
+            except (ValueError, TypeError) as error:
+                return '400 Bad Request', {'error': str(error)}
+            except Exception as error:
+                return '500 Internal Server Error', {'error': f'{type(error).__name__}: {error}'}
+            return '200 OK', results[0] if single else results
+        return '404 Not Found', {'error': f'No route for {method} {path}.'}
+
+    async def start(self, host='127.0.0.1', port=8765, unix_socket=None):
+        self.queue = asyncio.Queue()
+        self._batch_task = asyncio.create_task(self._batcher())
+        if unix_socket:
+            return await asyncio.start_unix_server(self._handle, path=unix_socket)
+        return await asyncio.start_server(self._handle, host, port)
+
+async def _serve(args):
+    service = ScoringService(max_batch=args.max_batch, max_wait=args.max_wait_ms/1000, cache_size=args.cache_size)
+    server = await service.start(args.host, args.port, args.unix_socket)
+    print(f"Serving on {args.unix_socket or f'http://{args.host}:{args.port}'}")
+    async with server:
+        await server.serve_forever()
+
+def main():
+    parser = argparse.ArgumentParser(description='Local PMYojana scoring service with micro-batching and an LRU result cache.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix-socket', help='listen on this Unix socket instead of TCP')
+    parser.add_argument('--max-batch', type=int, default=1024)
+    parser.add_argument('--max-wait-ms', type=float, default=2.0)
+    parser.add_argument('--cache-size', type=int, default=100000)
+    args = parser.parse_args()
+    asyncio.run(_serve(args))
+
+if __name__ == '__main__':
+    main()
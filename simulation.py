@@ -0,0 +1,170 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from code import PMYojana
+
+#Histogram resolution of the streamed aggregates: 0.01 percentage points of return, 0.01 years of payback
+#(plus one bin past the horizon for paths that never pay back)
+RETURN_RANGE = (-100.0, 100.0)
+PAYBACK_WIDTH = 0.01
+BIN_WIDTH = 0.01
+PERCENTILES = [1, 5, 10, 25, 50, 75, 90, 95, 99]
+
+def default_drivers(model: PMYojana):
+    '''
+    Distributions of the uncertain drivers, centred on the model constants.
+    Each entry is a constant or a (numpy.random.Generator method, *args) tuple;
+    inflation is drawn independently for every year of every path.
+    '''
+    return {
+        'inflation': ('normal', model.INFLATION, 0.01),
+        'land_increase': ('normal', model.LAND_INCREASE, 0.01),
+        'first_year_degradation': ('uniform', 0.97, 0.99),
+        'annual_degradation': ('uniform', 0.99, 0.997),
+        'units': ('normal', model.UNITS, 300),
+    }
+
+def _sample(rng, spec, size):
+    if isinstance(spec, (int, float)):
+        return np.full(size, float(spec))
+    method, *args = spec
+    return getattr(rng, method)(*args, size=size)
+
+def _histogram(values, low, high, width=BIN_WIDTH):
+    '''
+    Counts and sums per fixed-width bin; values outside [low, high) land in the edge bins.
+    '''
+    bins = int(round((high - low)/width))
+    index = np.clip(np.floor((values - low)/width).astype(np.int64), 0, bins - 1)
+    return np.bincount(index, minlength=bins), np.bincount(index, weights=values, minlength=bins)
+
+def _simulate_chunk(model: PMYojana, scenario: dict, drivers: dict, seed, paths: int):
+    '''
+    Cash flows of one scenario over paths sampled paths, reduced to histogram aggregates.
+    '''
+    rng = np.random.default_rng(seed)
+    years = np.arange(model.YOJANA_LENGTH)
+    inflation = _sample(rng, drivers['inflation'], (paths, model.YOJANA_LENGTH))
+    land_increase = _sample(rng, drivers['land_increase'], (paths, 1))
+    first_year_degradation = _sample(rng, drivers['first_year_degradation'], (paths, 1))
+    annual_degradation = _sample(rng, drivers['annual_degradation'], (paths, 1))
+    units = _sample(rng, drivers['units'], paths)
+
+    gross_return = (scenario['project_size'] * units * 365 * scenario['bid_rate'])[:, None] * (first_year_degradation * annual_degradation**years)
+    emi = model.emi_array(project_size=scenario['project_size'], loan_size=scenario['loan_size'], pay_emi_in=scenario['pay_emi_in'], subsidy_size=scenario['subsidy_size'], bank_loan_rate=scenario['bank_loan_rate'], DCR_status=scenario['DCR_status'])
+    land_cost = scenario['cost_per_bigha_per_month'] * (1 + land_increase)**(years//2) * model.land_need(project_size=scenario['project_size'])
+    #expenses rise with the previous years' inflation, the deflator includes the current year
+    raises = np.cumprod(1 + inflation*scenario['raise_rate'], axis=1)
+    expense_cost = scenario['monthly_expenses'] * 12 * np.hstack([np.ones((paths, 1)), raises[:, :-1]])
+    deflator = np.cumprod(1 + inflation, axis=1)
+
+    nominal_amount = gross_return - emi - land_cost - expense_cost
+    real_amount = nominal_amount / deflator
+    overall_investment = float(model._overall_investment(project_size=scenario['project_size'], loan_size=scenario['loan_size'], subsidy_size=scenario['subsidy_size'], DCR_status=scenario['DCR_status']))
+
+    aggregates = {}
+    for name, amount in [('Nominal Return', nominal_amount), ('Real Return', real_amount)]:
+        with np.errstate(invalid='ignore'):
+            returns = (((amount.sum(axis=1)/overall_investment)**(1/model.YOJANA_LENGTH))-1)*100
+        #a negative total return has no annualized rate; count it as a total loss
+        returns = np.where(np.isnan(returns), RETURN_RANGE[0], returns)
+        aggregates[name] = _histogram(returns, *RETURN_RANGE)
+    #paths that never pay back count as the horizon and get the bin past it to themselves
+    payback = model.payback_years(real_amount, np.full(paths, overall_investment))
+    payback = np.where(np.isnan(payback), float(model.YOJANA_LENGTH), payback)
+    aggregates['Full ROI'] = _histogram(payback, 0.0, model.YOJANA_LENGTH + PAYBACK_WIDTH, PAYBACK_WIDTH)
+    aggregates['paths'] = paths
+
+    return aggregates
+
+def _merge(total, chunk):
+    if total is None:
+        return chunk
+    for name, value in chunk.items():
+        if name == 'paths':
+            total[name] += value
+        else:
+            total[name] = (total[name][0] + value[0], total[name][1] + value[1])
+    return total
+
+def _summarize(counts, sums, low, width, upper=False):
+    '''
+    Mean, percentiles and 95% VaR/CVaR from a streamed histogram. The worst outcomes are the low values
+    (VaR is the 5th percentile, CVaR the mean of the lowest 5%), or the high ones if upper (95th percentile
+    and mean of the highest 5%), as for payback years.
+    '''
+    n = counts.sum()
+    if n == 0:
+        return {'mean': np.nan, **{f'p{q}': np.nan for q in PERCENTILES}, 'VaR 95': np.nan, 'CVaR 95': np.nan}
+    cumulative = np.cumsum(counts)
+
+    def percentile(q):
+        rank = q/100 * n
+        k = min(int(np.searchsorted(cumulative, rank)), len(counts) - 1)
+        before = cumulative[k] - counts[k]
+        inside = (rank - before)/counts[k] if counts[k] else 0.0
+        return low + (k + inside)*width
+
+    summary = {'mean': sums.sum()/n}
+    for q in PERCENTILES:
+        summary[f'p{q}'] = percentile(q)
+    #worst 5%: whole bins beyond the VaR bin plus the needed share of that bin, counted from the worst end
+    tail_counts, tail_sums = (counts[::-1], sums[::-1]) if upper else (counts, sums)
+    tail_cumulative = np.cumsum(tail_counts)
+    rank = 0.05 * n
+    k = min(int(np.searchsorted(tail_cumulative, rank)), len(counts) - 1)
+    before = tail_cumulative[k] - tail_counts[k]
+    tail = tail_sums[:k].sum() + (tail_sums[k]/tail_counts[k]*(rank - before) if tail_counts[k] else 0.0)
+    summary['VaR 95'] = summary['p95' if upper else 'p5']
+    summary['CVaR 95'] = tail/rank
+
+    return {name: float(value) for name, value in summary.items()}
+
+def simulate(bid_rate: float, project_size: float, loan_size: float, pay_emi_in: int, subsidy_size: float, DCR_status=True, cost_per_bigha_per_month = 3e4, monthly_expenses=5e4, raise_rate=1/2, bank_loan_rate=0.105,
+             paths=100000, drivers=None, seed=0, chunk_size=2**14, workers=1, target_payback=None, model=None):
+    '''
+    Monte Carlo distribution of returns and payback of one scenario under uncertain inflation (per year),
+    land price increase, panel degradation and yield. drivers overrides entries of default_drivers.
+    Paths are evaluated chunk_size at a time, optionally on a pool of workers processes; every chunk has its own
+    seed spawned from seed, so results do not depend on workers. Only per-chunk histograms are kept, so memory
+    does not grow with paths.
+    Returns percentiles, VaR/CVaR, P(loss) for Real/Nominal Return, the same for payback years (where the worst
+    case is the slowest 5%, and paths that never pay back count as YOJANA_LENGTH years), and the probability of
+    payback within the Yojana (and within target_payback years if given).
+    '''
+    model = PMYojana() if model is None else model
+    drivers = dict(default_drivers(model), **(drivers or {}))
+    scenario = {'bid_rate': bid_rate, 'project_size': project_size, 'loan_size': loan_size, 'pay_emi_in': pay_emi_in, 'subsidy_size': subsidy_size, 'DCR_status': DCR_status,
+                'cost_per_bigha_per_month': cost_per_bigha_per_month, 'monthly_expenses': monthly_expenses, 'raise_rate': raise_rate, 'bank_loan_rate': bank_loan_rate}
+    sizes = [min(chunk_size, paths - start) for start in range(0, paths, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    total = None
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for chunk in pool.map(_simulate_chunk, [model]*len(sizes), [scenario]*len(sizes), [drivers]*len(sizes), seeds, sizes):
+                total = _merge(total, chunk)
+    else:
+        for chunk_seed, size in zip(seeds, sizes):
+            total = _merge(total, _simulate_chunk(model, scenario, drivers, chunk_seed, size))
+
+    results = {'paths': total['paths']}
+    for name in ['Real Return', 'Nominal Return']:
+        counts, sums = total[name]
+        results[name] = _summarize(counts, sums, RETURN_RANGE[0], BIN_WIDTH)
+        zero = int(round((0.0 - RETURN_RANGE[0])/BIN_WIDTH))
+        results[name]['P(loss)'] = float(counts[:zero].sum()/total['paths'])
+    counts, sums = total['Full ROI']
+    horizon = float(model.YOJANA_LENGTH)
+    #percentiles inside the never-recovered bin are the horizon itself
+    results['Full ROI'] = {name: min(value, horizon) for name, value in _summarize(counts, sums, 0.0, PAYBACK_WIDTH, upper=True).items()}
+    results['P(payback)'] = float(counts[:-1].sum()/total['paths'])
+    if target_payback is not None:
+        results['P(payback <= target)'] = float(counts[:min(int(round(target_payback/PAYBACK_WIDTH)), len(counts) - 1)].sum()/total['paths'])
+
+    return results
+
+if __name__ == '__main__':
+    import pprint
+    pprint.pprint(simulate(bid_rate=2.75, project_size=3.0, loan_size=70, pay_emi_in=11, subsidy_size=1.8e7, target_payback=10))
@@ -0,0 +1,208 @@
+import collections
+import pickle
+import zipfile
+
+import numpy as np
+
+from code import PMYojana, SCENARIO_COLUMNS, load_scenarios
+
+class _Module():
+    '''
+    Stand-in for the torch.nn modules stored in model.pth; only their pickled state is kept.
+    '''
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+
+class _Sequential(_Module):
+    pass
+
+class _Linear(_Module):
+    pass
+
+class _ReLU(_Module):
+    pass
+
+def _rebuild_tensor(storage, storage_offset, size, stride, *args):
+    '''
+    The tensor's view of its storage. np.ndarray checks that the offset, shape and strides read from the file stay
+    inside the storage, so a corrupt file cannot read past it.
+    '''
+    itemsize = storage.dtype.itemsize
+    try:
+        tensor = np.ndarray(tuple(size), dtype=storage.dtype, buffer=storage, offset=storage_offset * itemsize, strides=[s * itemsize for s in stride])
+    except (ValueError, TypeError) as error:
+        raise pickle.UnpicklingError(f'Tensor of size {tuple(size)} does not fit in its storage of {len(storage)} values.') from error
+    return tensor.copy()
+
+def _rebuild_parameter(data, *args):
+    return data
+
+class _WeightsUnpickler(pickle.Unpickler):
+    '''
+    Reads a torch.save()d nn.Sequential of Linear/ReLU layers into NumPy without importing torch.
+    Only the classes such a file needs are allowed, anything else is refused.
+    '''
+    CLASSES = {
+        ('torch.nn.modules.container', 'Sequential'): _Sequential,
+        ('torch.nn.modules.linear', 'Linear'): _Linear,
+        ('torch.nn.modules.activation', 'ReLU'): _ReLU,
+        ('torch._utils', '_rebuild_tensor_v2'): _rebuild_tensor,
+        ('torch._utils', '_rebuild_parameter'): _rebuild_parameter,
+        ('torch', 'FloatStorage'): np.float32,
+        ('torch', 'DoubleStorage'): np.float64,
+        ('collections', 'OrderedDict'): collections.OrderedDict,
+        ('__builtin__', 'set'): set,
+        ('builtins', 'set'): set,
+    }
+
+    def __init__(self, file, archive: zipfile.ZipFile, prefix: str):
+        super().__init__(file)
+        self.archive = archive
+        self.prefix = prefix
+
+    def find_class(self, module, name):
+        if (module, name) not in self.CLASSES:
+            raise pickle.UnpicklingError(f'{module}.{name} is not allowed in a surrogate model file.')
+        return self.CLASSES[(module, name)]
+
+    def persistent_load(self, pid):
+        _, dtype, key, location, numel = pid
+        return np.frombuffer(self.archive.read(f'{self.prefix}/data/{key}'), dtype=np.dtype(dtype).newbyteorder('<'))[:numel]
+
+def load_layers(path='model.pth'):
+    '''
+    The (weight, bias) pairs and activations of the saved network, in order, as NumPy arrays.
+    '''
+    with zipfile.ZipFile(path) as archive:
+        pickle_name = next(name for name in archive.namelist() if name.endswith('data.pkl'))
+        with archive.open(pickle_name) as file:
+            network = _WeightsUnpickler(file, archive, pickle_name.rsplit('/', 1)[0]).load()
+    layers = []
+    for module in network._modules.values():
+        if isinstance(module, _Linear):
+            layers.append(('linear', module._parameters['weight'].astype(np.float64), module._parameters['bias'].astype(np.float64)))
+        elif isinstance(module, _ReLU):
+            layers.append(('relu', None, None))
+
+    return layers
+
+def exact_score(real_return, reference):
+    '''
+    Maps real annualized returns onto the surrogate's target scale: the percentile of each return
+    within the reference returns, in steps of 5 from 0 to 95 (how forCode.csv's last column is built).
+    '''
+    reference = np.sort(np.asarray(reference, dtype=float))
+    percentile = np.searchsorted(reference, real_return, side='right') / len(reference)
+    return np.minimum(np.floor(percentile * 20) * 5, 95)
+
+def _rank(values):
+    ranks = np.empty(len(values))
+    ranks[np.argsort(values, kind='stable')] = np.arange(len(values))
+    return ranks
+
+def rank_correlation(a, b):
+    '''
+    Spearman rank correlation, ignoring pairs with NaN.
+    '''
+    a, b = np.asarray(a, dtype=float), np.asarray(b, dtype=float)
+    keep = ~(np.isnan(a) | np.isnan(b))
+    return float(np.corrcoef(_rank(a[keep]), _rank(b[keep]))[0, 1])
+
+class Surrogate():
+    '''
+    CPU-only NumPy predictor for the network in model.pth, trained on the forCode.csv grid.
+    It maps the six SCENARIO_COLUMNS to a 0-100 score of the real annualized return (see exact_score).
+    The weights and training grid are loaded on first use.
+    '''
+    def __init__(self, path='model.pth', grid='forCode.csv', model=None) -> None:
+        self.path = path
+        self.grid = grid
+        self.model = PMYojana() if model is None else model
+        self._layers = None
+        self._reference = None
+
+    @property
+    def layers(self):
+        if self._layers is None:
+            self._layers = load_layers(self.path)
+        return self._layers
+
+    @property
+    def reference(self):
+        '''
+        The training grid with its exact real returns, used for the score scale and the input domain.
+        '''
+        if self._reference is None:
+            scenarios = load_scenarios(self.grid)
+            scenarios['Real Return'] = self.model.batch_evaluate(scenarios)['Real Return']
+            self._reference = scenarios
+        return self._reference
+
+    def _features(self, scenarios=None, **kwargs):
+        inputs = self.model._batch_inputs(scenarios, **kwargs)
+        return np.column_stack([inputs[name].astype(float) for name in SCENARIO_COLUMNS])
+
+    def predict(self, scenarios=None, chunk_size=2**16, **kwargs):
+        '''
+        Surrogate scores for a DataFrame/dict or keyword arrays of scenarios, evaluated chunk_size rows at a time.
+        '''
+        features = self._features(scenarios, **kwargs)
+        scores = np.empty(len(features))
+        for start in range(0, len(features), chunk_size):
+            hidden = features[start:start + chunk_size]
+            for kind, weight, bias in self.layers:
+                hidden = hidden @ weight.T + bias if kind == 'linear' else np.maximum(hidden, 0)
+            scores[start:start + chunk_size] = hidden[:, 0]
+
+        return scores
+
+    def in_domain(self, scenarios=None, **kwargs):
+        '''
+        True for scenarios inside the training grid's range on every input; predictions elsewhere are low-confidence.
+        '''
+        features = self._features(scenarios, **kwargs)
+        bounds = self.reference[SCENARIO_COLUMNS].astype(float)
+        return np.all((features >= bounds.min().values) & (features <= bounds.max().values), axis=1)
+
+    def validate(self, holdout=0.2):
+        '''
+        Error of the surrogate on the last holdout fraction of the training grid, against the exact engine:
+        mean absolute error to the file's target and to the exact score, and rank correlation with the
+        exact Real Return and Full ROI.
+        '''
+        reference = self.reference
+        held_out = reference.iloc[int(len(reference) * (1 - holdout)):]
+        predicted = self.predict(held_out)
+        exact = self.model.batch_evaluate(held_out)
+
+        return {
+            'rows': len(held_out),
+            'mae_target': float(np.mean(np.abs(predicted - held_out['target']))),
+            'mae_exact_score': float(np.mean(np.abs(predicted - exact_score(exact['Real Return'], reference['Real Return'])))),
+            'rank_correlation_real_return': rank_correlation(predicted, exact['Real Return']),
+            'rank_correlation_full_roi': rank_correlation(-predicted, exact['Full ROI']),
+        }
+
+    def screen(self, scenarios=None, top_k=100, oversample=10, metric='Real Return', **kwargs):
+        '''
+        Best top_k scenarios by the exact metric, using the surrogate to pick which ones to score exactly.
+        scenarios are given like for predict; dicts and keyword arrays are turned into a DataFrame first.
+        The top top_k*oversample surrogate scores plus every out-of-domain scenario are re-scored with the
+        vectorized engine; the result has the exact per-scenario outputs and the surrogate score.
+        '''
+        import pandas as pd
+
+        if kwargs or not isinstance(scenarios, pd.DataFrame):
+            scenarios = pd.DataFrame(self.model._batch_inputs(scenarios, **kwargs), index=getattr(scenarios, 'index', None))
+        scores = self.predict(scenarios)
+        candidates = np.argsort(-scores, kind='stable')[:top_k * oversample]
+        candidates = np.union1d(candidates, np.flatnonzero(~self.in_domain(scenarios)))
+        chosen = scenarios.iloc[candidates]
+        summary = self.model.batch_summary(chosen)
+        summary['Surrogate Score'] = scores[candidates]
+        ascending = metric == 'Full ROI'
+
+        return pd.concat([chosen, summary], axis=1).sort_values(metric, ascending=ascending).head(top_k)
+
+if __name__ == '__main__':
+    print(Surrogate().validate())
@@ -0,0 +1,158 @@
+import itertools
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from code import PMYojana, load_scenarios
+
+SCENARIOS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'forCode.csv')
+
+@pytest.fixture(scope='module')
+def scenarios():
+    return load_scenarios(SCENARIOS_PATH).head(40)
+
+def test_batch_matches_per_scenario_methods(scenarios):
+    model = PMYojana()
+    results = model.batch_evaluate(scenarios)
+    for i, row in enumerate(scenarios.head(20).itertuples(index=False)):
+        kwargs = dict(bid_rate=row.bid_rate, project_size=row.project_size, loan_size=row.loan_size, pay_emi_in=row.pay_emi_in, subsidy_size=row.subsidy_size, DCR_status=row.DCR_status)
+        assert np.array_equal(model.nominal_amount(**kwargs)['Nominal Amount'].values, results['Nominal Amount'][i])
+        assert np.array_equal(model.real_amount(**kwargs)['Real Amount'].values, results['Real Amount'][i])
+        assert np.array_equal(model.emi_payment(row.project_size, row.loan_size, row.pay_emi_in, row.subsidy_size, DCR_status=row.DCR_status)['EMI'].values, results['EMI'][i])
+        #Python and NumPy pow may differ in the last bit
+        assert model._annualized_return(realized=True, **kwargs) == pytest.approx(results['Real Return'][i], rel=1e-12)
+        assert model._annualized_return(realized=False, **kwargs) == pytest.approx(results['Nominal Return'][i], rel=1e-12)
+        assert model.full_roi(_output=True, **kwargs) == round(results['Full ROI'][i], 1)
+
+def test_loans_need_a_repayment_term():
+    model = PMYojana()
+    with pytest.raises(ValueError):
+        model._annualized_return(2.75, 3, 70, 0, 1.8e7, True, True)
+    with pytest.raises(ValueError):
+        model.batch_evaluate(bid_rate=2.75, project_size=3, loan_size=70, pay_emi_in=[0, 11], subsidy_size=1.8e7)
+    with pytest.raises(ValueError):
+        model.emi_array(project_size=3, loan_size=70, pay_emi_in=-1, subsidy_size=1.8e7)
+
+def test_expense_curves_do_not_depend_on_the_batch(scenarios):
+    model = PMYojana()
+    rates = np.linspace(0, 1, 500)
+    curves = model._expense_curve(rates)
+    assert model.curve_cache_info()['size'] == 0
+    for rate, curve in zip(rates, curves):
+        assert np.array_equal(curve, model.curve('expense', raise_rate=rate))
+
+    alone = model.batch_evaluate(scenarios.head(1), raise_rate=0.3)
+    crowded = model.batch_evaluate(scenarios.iloc[[0]*500], raise_rate=np.where(np.arange(500) == 0, 0.3, rates))
+    assert alone['Real Return'][0] == crowded['Real Return'][0]
+    assert np.array_equal(alone['Expense Cost'][0], crowded['Expense Cost'][0])
+
+def test_curve_cache_is_bounded_and_keeps_hot_curves():
+    model = PMYojana()
+    model.curve('inflation')
+    for rate in np.linspace(0, 1, 3*model.CURVE_CACHE_SIZE):
+        model.curve('expense', raise_rate=rate)
+        model.curve('inflation')
+    info = model.curve_cache_info()
+    assert info['size'] == model.CURVE_CACHE_SIZE
+    misses = info['misses']
+    model.curve('inflation')
+    assert model.curve_cache_info()['misses'] == misses
+
+def test_payback_needs_positive_investment():
+    model = PMYojana()
+    assert np.isnan(model.payback_years(np.ones(25), 0.0))
+    assert np.isnan(model.payback_years(np.ones(25), -5.0))
+    assert model.payback_years(np.ones(25), 2.5) == 2.5
+
+def test_solve_loan_size_reaches_target(scenarios):
+    model = PMYojana()
+    subset = scenarios.head(10)
+    loan_size = model.solve_loan_size(5, metric='Real Return', scenarios=subset)
+    assert not np.isnan(loan_size[0])
+    solved = ~np.isnan(loan_size)
+    real_return = model.batch_evaluate(subset, loan_size=np.where(solved, loan_size, 0))['Real Return']
+    np.testing.assert_allclose(real_return[solved], 5, atol=1e-5)
+    payback_loan = model.solve_loan_size(8, metric='Full ROI', scenarios=subset)
+    assert np.all(np.isnan(payback_loan) | (payback_loan < 100))
+
+def test_sensitivity_grid_matches_batch_evaluate():
+    model = PMYojana()
+    axes = {'bid_rate': [2.5, 2.75, 3.0], 'DCR_status': [True, False], 'pay_emi_in': [8, 11]}
+    grid = model.sensitivity(axes, metric='Real Return', chunk_size=5, project_size=3.0, loan_size=70, subsidy_size=1.8e7)
+    assert grid.shape == (3, 2, 2)
+    series = grid.to_series()
+    assert list(series.index.names) == list(axes) and series.name == 'Real Return'
+    for bid_rate, DCR_status, pay_emi_in in itertools.product(*axes.values()):
+        expected = model.batch_evaluate(bid_rate=bid_rate, DCR_status=DCR_status, pay_emi_in=pay_emi_in, project_size=3.0, loan_size=70, subsidy_size=1.8e7)['Real Return'][0]
+        assert series[(bid_rate, DCR_status, pay_emi_in)] == expected
+    assert grid.values[1, 0, 1] == series[(2.75, True, 11)]
+    with pytest.raises(ValueError):
+        model.sensitivity({'bid': [1, 2]}, project_size=3.0, loan_size=70, pay_emi_in=11, subsidy_size=1.8e7)
+
+def test_instrument_records_the_pipeline_stages(scenarios):
+    expected = PMYojana().batch_evaluate(scenarios)
+    model = PMYojana()
+    timings = model.instrument()
+    results = model.batch_evaluate(scenarios)
+    model.batch_evaluate(scenarios)
+    summary = timings.summary()
+    for stage in ['batch', 'cash flows', 'gross', 'loan', 'emi', 'land', 'expenses', 'payback', 'curve build', 'curve lookup']:
+        assert summary[stage]['calls'] > 0, stage
+    assert summary['batch']['calls'] == summary['cash flows']['calls'] == summary['emi']['calls'] == 2
+    model.emi_array(project_size=3.0, loan_size=70, pay_emi_in=11, subsidy_size=1.8e7)
+    assert timings.summary()['emi']['calls'] == 3 and timings.summary()['loan']['calls'] == 3
+    for name, values in expected.items():
+        assert np.array_equal(results[name], values, equal_nan=True)
+
+    model.uninstrument()
+    model.batch_evaluate(scenarios)
+    assert timings.summary()['batch']['calls'] == 2
+
+def test_report_names_are_validated(scenarios, tmp_path):
+    model = PMYojana()
+    for names in [['a', 'b'], ['a', 'a', 'b'], ['a', 'x/y', 'c'], ['a', '..', 'c']]:
+        with pytest.raises(ValueError):
+            model.generate_latex_reports(scenarios.head(3), output_dir=str(tmp_path / 'reports'), names=names)
+    assert not (tmp_path / 'reports').exists()
+
+def test_monthly_cash_flows_add_up_to_yearly(scenarios):
+    model = PMYojana()
+    inputs = model._batch_inputs(scenarios)
+    yearly = model.cash_flows(**inputs)
+    monthly = model.cash_flows(**inputs, periods_per_year=12).annual()
+    for stage in ['gross_return', 'emi', 'land_cost', 'expense_cost']:
+        np.testing.assert_allclose(getattr(monthly, stage), getattr(yearly, stage), rtol=1e-14)
+    np.testing.assert_allclose(model.batch_evaluate(scenarios, periods_per_year=12)['Full ROI'], model.batch_evaluate(scenarios)['Full ROI'], rtol=1e-12)
+
+@pytest.mark.parametrize('metric, min_cash_flow, max_loan', [('Real Return', None, None), ('Full ROI', 2e5, None), ('Nominal Return', 0, 5e7)])
+def test_optimize_financing_matches_brute_force(scenarios, metric, min_cash_flow, max_loan):
+    model = PMYojana()
+    projects = scenarios.head(5)
+    loan_sizes, max_term = [0, 30, 60, 90], 10
+    best = model.optimize_financing(projects, metric=metric, loan_sizes=loan_sizes, max_term=max_term, min_cash_flow=min_cash_flow, max_loan=max_loan)
+    for index, row in projects.iterrows():
+        grid = pd.DataFrame([dict(bid_rate=row.bid_rate, project_size=row.project_size, subsidy_size=row.subsidy_size, DCR_status=status, loan_size=loan, pay_emi_in=term)
+                             for status, loan, term in itertools.product([True, False], loan_sizes, range(1, max_term + 1))])
+        results = model.batch_evaluate(grid)
+        feasible = results['Overall Investment'] > 0
+        if min_cash_flow is not None:
+            feasible &= results['Nominal Amount'].min(axis=1) >= min_cash_flow
+        if max_loan is not None:
+            feasible &= model._loan_amount_array(grid['project_size'], grid['DCR_status'], grid['loan_size'], grid['subsidy_size']) <= max_loan
+        values = np.where(feasible, results[metric], np.nan)
+        if np.isnan(values).all():
+            assert np.isnan(best.loc[index, metric])
+        else:
+            assert best.loc[index, metric] == pytest.approx(np.nanmin(values) if metric == 'Full ROI' else np.nanmax(values), rel=1e-9)
+
+def test_importing_code_leaves_heavy_modules_unloaded():
+    import subprocess
+    import sys
+
+    from benchmarks import HEAVY_MODULES
+
+    script = f'import sys, code; code.PMYojana; print(",".join(name for name in {HEAVY_MODULES!r} if name in sys.modules))'
+    loaded = subprocess.run([sys.executable, '-c', script], cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True, check=True).stdout
+    assert loaded.strip() == ''
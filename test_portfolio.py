@@ -0,0 +1,39 @@
+import os
+
+import numpy as np
+import pytest
+
+from code import PMYojana, load_scenarios
+from portfolio import Portfolio
+
+SCENARIOS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'forCode.csv')
+
+@pytest.fixture(scope='module')
+def scenarios():
+    return load_scenarios(SCENARIOS_PATH).head(40)
+
+def test_portfolio_totals_after_edits(scenarios):
+    model = PMYojana()
+    portfolio = Portfolio(scenarios.head(20), model=model)
+    portfolio.add(scenarios.iloc[20:])
+    portfolio.remove([3, 7, 25, 39])
+    portfolio.update([0, 1], monthly_expenses=8e4, bid_rate=[3.0, 3.1])
+
+    table = portfolio.table()
+    results = model.batch_evaluate(table)
+    np.testing.assert_allclose(portfolio.total_real, results['Real Amount'].sum(axis=0), rtol=1e-12)
+    portfolio.refresh()
+    assert np.array_equal(portfolio.total_nominal, results['Nominal Amount'].sum(axis=0))
+    assert np.array_equal(portfolio.total_real, results['Real Amount'].sum(axis=0))
+    assert portfolio.total_investment == results['Overall Investment'].sum()
+
+def test_repeated_ids_leave_the_portfolio_unchanged(scenarios):
+    portfolio = Portfolio(scenarios.head(10))
+    before = (portfolio.total_nominal.copy(), portfolio.total_real.copy(), portfolio.total_investment, list(portfolio.ids))
+    for change in [lambda: portfolio.remove([3, 3]), lambda: portfolio.update([0, 0], bid_rate=[3.0, 3.1]), lambda: portfolio.remove([3, 99])]:
+        with pytest.raises((ValueError, KeyError)):
+            change()
+    assert np.array_equal(portfolio.total_nominal, before[0]) and np.array_equal(portfolio.total_real, before[1])
+    assert portfolio.total_investment == before[2] and portfolio.ids == before[3]
+    assert len(portfolio) == len(portfolio.index) == 10
+    assert portfolio.total_investment == portfolio.table()['Overall Investment'].sum()
@@ -0,0 +1,45 @@
+import os
+
+import numpy as np
+
+from code import PMYojana, load_scenarios
+from result_cache import ResultCache
+
+SCENARIOS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'forCode.csv')
+
+def _assert_same(results, expected):
+    assert results.keys() == expected.keys()
+    for name, values in expected.items():
+        assert np.array_equal(results[name], values, equal_nan=True), name
+
+def test_cached_results_equal_uncached(tmp_path):
+    scenarios = load_scenarios(SCENARIOS_PATH).head(60)
+    #a scenario that never pays back, so NaN goes through the cache too
+    scenarios.loc[0, 'bid_rate'] = 1.0
+    model = PMYojana()
+    expected = model.batch_evaluate(scenarios)
+    assert np.isnan(expected['Full ROI'][0])
+
+    cache = ResultCache(str(tmp_path / 'cache.sqlite'))
+    _assert_same(model.batch_evaluate(scenarios.head(20), cache=cache), model.batch_evaluate(scenarios.head(20)))
+    _assert_same(model.batch_evaluate(scenarios, cache=cache), expected)
+    assert cache.info() == {'hits': 20, 'misses': 60, 'entries': 60}
+    cache.close()
+
+    reopened = ResultCache(str(tmp_path / 'cache.sqlite'))
+    _assert_same(model.batch_evaluate(scenarios, cache=reopened), expected)
+    assert (reopened.hits, reopened.misses) == (60, 0)
+
+    model.INFLATION = 0.07
+    _assert_same(model.batch_evaluate(scenarios, cache=reopened), model.batch_evaluate(scenarios))
+    assert (reopened.hits, reopened.misses) == (60, 60)
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    scenarios = load_scenarios(SCENARIOS_PATH).head(30)
+    model = PMYojana()
+    cache = ResultCache(str(tmp_path / 'cache.sqlite'), max_entries=20)
+    model.batch_evaluate(scenarios.head(20), cache=cache)
+    model.batch_evaluate(scenarios.iloc[20:], cache=cache)
+    assert cache.info()['entries'] <= 20
+    model.batch_evaluate(scenarios.iloc[20:], cache=cache)
+    assert cache.hits == 10
@@ -0,0 +1,44 @@
+import os
+
+import numpy as np
+import pytest
+
+from code import PMYojana, load_scenarios
+from scenario import Scenario
+
+SCENARIOS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'forCode.csv')
+
+@pytest.fixture(scope='module')
+def scenarios():
+    return load_scenarios(SCENARIOS_PATH).head(40)
+
+def test_scenario_matches_batch_and_recomputes_only_affected(scenarios):
+    model = PMYojana()
+    scenario = Scenario(scenarios, model=model)
+    results = scenario.results()
+    for name, values in model.batch_evaluate(scenarios).items():
+        assert np.array_equal(results[name], values, equal_nan=True)
+
+    scenario.monthly_expenses = 6e4
+    results = scenario.results()
+    assert scenario.recomputations['EMI'] == 1 and scenario.recomputations['Gross Return'] == 1
+    assert scenario.recomputations['Expense Cost'] == 2
+    for name, values in model.batch_evaluate(scenarios, monthly_expenses=6e4).items():
+        assert np.array_equal(results[name], values, equal_nan=True)
+
+    scenario.bid_rate = scenarios['bid_rate'] * 1.1
+    scenario.results()
+    assert scenario.recomputations['Land Cost'] == 1 and scenario.recomputations['Gross Return'] == 2
+
+def test_single_scenario_and_timed_emi():
+    exact = PMYojana()
+    model = PMYojana()
+    timings = model.instrument()
+    scenario = Scenario(bid_rate=2.75, project_size=3.0, loan_size=70, pay_emi_in=11, subsidy_size=1.8e7, model=model)
+    assert scenario['Real Return'] == pytest.approx(exact._annualized_return(2.75, 3.0, 70, 11, 1.8e7, True, True), rel=1e-12)
+    scenario.pay_emi_in = 8
+    assert np.array_equal(scenario['EMI'], exact.emi_array(project_size=3.0, loan_size=70, pay_emi_in=8, subsidy_size=1.8e7))
+    assert scenario.recomputations['Loan Amount'] == 1 and scenario.recomputations['EMI'] == 2
+    assert timings.summary()['emi']['calls'] == 2
+    with pytest.raises(ValueError):
+        scenario.update(pay_emi_in=0)['EMI']
@@ -0,0 +1,22 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from code import PMYojana, load_scenarios
+from score import OUTPUT_COLUMNS, score_file
+
+SCENARIOS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'forCode.csv')
+
+def test_csv_output_does_not_depend_on_workers(tmp_path):
+    scenarios = tmp_path / 'scenarios.csv'
+    with open(SCENARIOS_PATH) as source:
+        scenarios.write_text(''.join(source.readlines()[:1000]))
+    serial, parallel = tmp_path / 'serial.csv', tmp_path / 'parallel.csv'
+    assert score_file(str(scenarios), str(serial), chunk_size=150, workers=1)[0] == 1000
+    assert score_file(str(scenarios), str(parallel), chunk_size=150, workers=2)[0] == 1000
+    assert serial.read_bytes() == parallel.read_bytes()
+
+    scored = pd.read_csv(serial)
+    expected = PMYojana().batch_summary(load_scenarios(str(scenarios)))[OUTPUT_COLUMNS]
+    np.testing.assert_allclose(scored[OUTPUT_COLUMNS].values, expected.values, rtol=1e-12)
@@ -0,0 +1,79 @@
+import asyncio
+import json
+
+import pytest
+
+from code import PMYojana
+from service import RESULT_COLUMNS, ScoringService
+
+SCENARIOS = [
+    {'bid_rate': 2.75, 'project_size': 3.0, 'loan_size': 70, 'pay_emi_in': 11, 'subsidy_size': 1.8e7},
+    {'bid_rate': 3.1, 'project_size': 2.0, 'loan_size': 50, 'pay_emi_in': 8, 'subsidy_size': 1.2e7, 'DCR_status': False},
+    {'bid_rate': 2.75, 'project_size': 3.0, 'loan_size': 100, 'pay_emi_in': 11, 'subsidy_size': 0},
+]
+
+def _serve(test):
+    '''
+    Runs test(service, port) against a service listening on a free local port.
+    '''
+    async def main():
+        service = ScoringService(max_wait=0.001)
+        server = await service.start(port=0)
+        try:
+            return await test(service, server.sockets[0].getsockname()[1])
+        finally:
+            server.close()
+            service._batch_task.cancel()
+    return asyncio.run(main())
+
+async def _post(port, bodies):
+    '''
+    Sends every body as POST /score on one keep-alive connection; returns (status, parsed JSON) per request.
+    '''
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    responses = []
+    for body in bodies:
+        writer.write(f'POST /score HTTP/1.1\r\nContent-Length: {len(body)}\r\n\r\n'.encode() + body)
+        status = (await reader.readline()).decode().split(' ', 1)[1].strip()
+        headers = {}
+        while (line := await reader.readline()) != b'\r\n':
+            name, _, value = line.decode().partition(':')
+            headers[name.strip().lower()] = value.strip()
+        data = await reader.readexactly(int(headers['content-length']))
+        responses.append((status, json.loads(data, parse_constant=lambda name: pytest.fail(f'{name} in JSON'))))
+    writer.close()
+    return responses
+
+def test_score_matches_batch_evaluate_and_caches():
+    async def test(service, port):
+        first = await service.score(SCENARIOS)
+        again = await service.score(SCENARIOS[:2])
+        return first, again, service.metrics()
+    first, again, metrics = _serve(test)
+
+    #only DCR_status is left out, and it defaults to True
+    expected = PMYojana().batch_evaluate(**{name: [scenario.get(name, True) for scenario in SCENARIOS] for name in SCENARIOS[1]})
+    for i, result in enumerate(first[:2]):
+        assert result == {name: float(expected[name][i]) for name in RESULT_COLUMNS}
+    assert again == first[:2]
+    assert metrics['cache_size'] == 3 and metrics['cache_hit_rate'] == 2/5
+    #a 100% loan without subsidy leaves no investment: the returns are undefined
+    assert first[2]['Overall Investment'] == 0 and first[2]['Real Return'] is None and first[2]['Full ROI'] is None
+
+def test_http_errors_and_valid_json():
+    bodies = [json.dumps(SCENARIOS[2]).encode(), b'{"bid_rate": 2.75', json.dumps(dict(SCENARIOS[0], pay_emi_in=0)).encode(),
+              json.dumps(dict(SCENARIOS[0], panels=3)).encode(), json.dumps(SCENARIOS).encode()]
+    responses = _serve(lambda service, port: _post(port, bodies))
+    assert [status for status, _ in responses] == ['200 OK'] + ['400 Bad Request']*3 + ['200 OK']
+    assert 'pay_emi_in' in responses[2][1]['error']
+    assert responses[0][1]['Nominal Return'] is None and len(responses[4][1]) == 3
+
+def test_unexpected_errors_are_500():
+    async def test(service, port):
+        def fail(params):
+            raise RuntimeError('engine down')
+        service._evaluate = fail
+        return await _post(port, [json.dumps(SCENARIOS[0]).encode(), json.dumps(SCENARIOS[1]).encode()])
+    responses = _serve(test)
+    assert [status for status, _ in responses] == ['500 Internal Server Error']*2
+    assert 'engine down' in responses[0][1]['error']
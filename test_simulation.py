@@ -0,0 +1,36 @@
+import pytest
+
+from code import PMYojana
+from simulation import simulate
+
+SCENARIO = {'bid_rate': 2.75, 'project_size': 3.0, 'loan_size': 70, 'pay_emi_in': 11, 'subsidy_size': 1.8e7}
+
+def test_results_do_not_depend_on_workers():
+    serial = simulate(**SCENARIO, paths=20000, chunk_size=4096, workers=1, seed=7)
+    parallel = simulate(**SCENARIO, paths=20000, chunk_size=4096, workers=2, seed=7)
+    assert serial == parallel
+
+def test_fixed_drivers_reproduce_the_model():
+    model = PMYojana()
+    drivers = {'inflation': model.INFLATION, 'land_increase': model.LAND_INCREASE, 'first_year_degradation': 0.98, 'annual_degradation': 0.994, 'units': model.UNITS}
+    results = simulate(**SCENARIO, paths=1000, drivers=drivers, model=model)
+    for name, realized in [('Real Return', True), ('Nominal Return', False)]:
+        expected = model._annualized_return(**SCENARIO, realized=realized, DCR_status=True)
+        assert results[name]['mean'] == pytest.approx(expected, rel=1e-9)
+        assert results[name]['p5'] == pytest.approx(expected, abs=0.01)
+    payback = model.payback_years(model.real_amount(**SCENARIO)['Real Amount'].values, model._overall_investment(3.0, 70, 1.8e7))
+    assert results['Full ROI']['mean'] == pytest.approx(payback, rel=1e-9)
+    assert results['P(payback)'] == 1.0
+
+def test_payback_risk_is_the_slow_tail():
+    results = simulate(**SCENARIO, paths=20000, target_payback=10)
+    payback = results['Full ROI']
+    assert payback['VaR 95'] == payback['p95']
+    assert payback['mean'] < payback['VaR 95'] <= payback['CVaR 95']
+    assert results['Real Return']['CVaR 95'] <= results['Real Return']['VaR 95'] < results['Real Return']['mean']
+
+def test_paths_that_never_pay_back_are_the_worst():
+    model = PMYojana()
+    results = simulate(**dict(SCENARIO, bid_rate=1.5), paths=5000, model=model)
+    assert results['P(payback)'] < 0.5
+    assert results['Full ROI']['p95'] == results['Full ROI']['CVaR 95'] == model.YOJANA_LENGTH
@@ -0,0 +1,27 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from code import SCENARIO_COLUMNS, load_scenarios
+from surrogate import Surrogate, _rebuild_tensor, load_layers
+
+def test_tensors_must_fit_in_their_storage():
+    storage = np.arange(10, dtype='<f4')
+    assert np.array_equal(_rebuild_tensor(storage, 1, (2, 3), (3, 1)), [[1, 2, 3], [4, 5, 6]])
+    for offset, size, stride in [(0, (4, 3), (3, 1)), (8, (2, 3), (3, 1)), (0, (2, 3), (1000, 1)), (-1, (2, 3), (3, 1))]:
+        with pytest.raises(pickle.UnpicklingError):
+            _rebuild_tensor(storage, offset, size, stride)
+
+def test_layers_load_without_torch():
+    shapes = [weight.shape for kind, weight, _ in load_layers() if kind == 'linear']
+    assert shapes[0][1] == len(SCENARIO_COLUMNS) and shapes[-1][0] == 1
+
+def test_screen_accepts_what_predict_accepts():
+    surrogate = Surrogate()
+    scenarios = load_scenarios().head(300)
+    best = surrogate.screen(scenarios, top_k=5)
+    assert len(best) == 5 and best['Real Return'].is_monotonic_decreasing
+    columns = {name: scenarios[name].values for name in SCENARIO_COLUMNS}
+    assert surrogate.screen(columns, top_k=5).index.tolist() == best.index.tolist()
+    assert surrogate.screen(top_k=5, **columns).index.tolist() == best.index.tolist()